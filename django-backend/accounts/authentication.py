@@ -0,0 +1,139 @@
+"""
+JWT authentication that resolves the user without a database round trip.
+
+Users are cached by id in two tiers: a small per-process LRU with a very short
+TTL, and the shared Django cache with a longer one. A save or delete of the
+user drops both (the per-process tier only in the process that made the
+change, hence its short TTL), as does logout. Queryset `.update()` calls skip
+the signals; call `invalidate_user` after them.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import (
+    JWTAuthentication,
+    JWTStatelessUserAuthentication,
+)
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+# Never copied into the cache; loaded on access like any deferred field.
+UNCACHED_FIELDS = {"password"}
+
+_local = OrderedDict()
+_local_lock = threading.Lock()
+
+
+def _cache_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def _local_get(user_id):
+    with _local_lock:
+        entry = _local.get(user_id)
+        if entry is None:
+            return None
+        expires, fields = entry
+        if expires < time.monotonic():
+            del _local[user_id]
+            return None
+        _local.move_to_end(user_id)
+        return fields
+
+
+def _local_set(user_id, fields):
+    with _local_lock:
+        _local[user_id] = (time.monotonic() + settings.AUTH_USER_LOCAL_CACHE_TTL, fields)
+        _local.move_to_end(user_id)
+        while len(_local) > settings.AUTH_USER_LOCAL_CACHE_SIZE:
+            _local.popitem(last=False)
+
+
+def _to_fields(user):
+    return {
+        field.attname: getattr(user, field.attname)
+        for field in user._meta.concrete_fields
+        if field.attname not in UNCACHED_FIELDS
+    }
+
+
+def _from_fields(model, fields):
+    # A fresh instance per request, so nothing a view sets on request.user leaks.
+    names = list(fields)
+    return model.from_db("default", names, [fields[name] for name in names])
+
+
+def get_cached_user(user_id):
+    """Return the user with primary key `user_id`, or None if there is none."""
+    User = get_user_model()
+    key = str(user_id)
+    fields = _local_get(key)
+    if fields is None:
+        fields = cache.get(_cache_key(key))
+        if fields is None:
+            user = User.objects.filter(pk=user_id).first()
+            if user is None:
+                return None
+            fields = _to_fields(user)
+            cache.set(_cache_key(key), fields, settings.AUTH_USER_CACHE_TTL)
+        _local_set(key, fields)
+    return _from_fields(User, fields)
+
+
+def invalidate_user(user_id):
+    """
+    Drop a user from both cache tiers now and again once the surrounding
+    transaction commits, so a concurrent request cannot re-cache the old row.
+    """
+    key = str(user_id)
+
+    def _drop():
+        with _local_lock:
+            _local.pop(key, None)
+        cache.delete(_cache_key(key))
+
+    _drop()
+    transaction.on_commit(_drop)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def _invalidate_on_change(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication with the user lookup served from `get_cached_user`."""
+
+    def get_user(self, validated_token):
+        # Revocation compares against the password hash, which is not cached,
+        # and the cache is keyed by primary key only.
+        if api_settings.CHECK_REVOKE_TOKEN or api_settings.USER_ID_FIELD != "id":
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    Opt-in for read-only views that only need `request.user.id`: the user is a
+    TokenUser built from the token claims, with no lookup at all. A user
+    deactivated mid-token keeps access until the access token expires.
+    """
@@ -1,5 +1,11 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts import authentication
 
 
 class AuthEndpointsTests(APITestCase):
@@ -59,3 +65,46 @@ class AuthEndpointsTests(APITestCase):
         self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
         response = self.client.post("/api/v1/auth/logout", {}, format="json")
         self.assertEqual(response.status_code, 200)
+
+
+class CachedJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="cached@example.com", password="StrongPass123", name="Cached User"
+        )
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_user_served_from_cache(self):
+        self.assertEqual(self.client.get("/api/v1/me").status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/v1/me")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["email"], "cached@example.com")
+
+        # Only the local tier is dropped: the shared cache still answers.
+        authentication._local.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/v1/me").status_code, 200)
+
+    def test_save_and_deactivation_invalidate(self):
+        self.client.get("/api/v1/me")
+        self.user.name = "Renamed"
+        self.user.save(update_fields=["name"])
+        self.assertEqual(self.client.get("/api/v1/me").data["name"], "Renamed")
+
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])
+        self.assertEqual(self.client.get("/api/v1/me").status_code, 401)
+
+    def test_logout_invalidates(self):
+        self.client.get("/api/v1/me")
+        self.assertIsNotNone(cache.get(f"auth:user:{self.user.pk}"))
+        self.client.post("/api/v1/auth/logout", {}, format="json")
+        self.assertIsNone(cache.get(f"auth:user:{self.user.pk}"))
+
+    def test_stateless_read_skips_user_lookup(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/v1/repayments/mine")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([q for q in queries if "accounts_user" in q["sql"]])
@@ -6,6 +6,9 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from core.throttling import EmailThrottle, IPThrottle
+
+from .authentication import invalidate_user
 from .serializers import (
     AuthResponseSerializer,
     LoginSerializer,
@@ -16,6 +19,8 @@ from .serializers import (
 
 class RegisterView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [IPThrottle, EmailThrottle]
+    throttle_scope = "register"
 
     @extend_schema(request=RegisterSerializer, responses=AuthResponseSerializer)
     def post(self, request):
@@ -31,13 +36,16 @@ class RegisterView(APIView):
 
 class LoginView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [IPThrottle, EmailThrottle]
+    throttle_scope = "login"
 
     @extend_schema(request=LoginSerializer, responses=AuthResponseSerializer)
     def post(self, request):
         serializer = LoginSerializer(data=request.data, context={"request": request})
         serializer.is_valid(raise_exception=True)
         user = serializer.validated_data["user"]
-        login(request, user)
+        if not settings.AUTH_STATELESS_API:
+            login(request, user)
         token = RefreshToken.for_user(user).access_token
         response_serializer = AuthResponseSerializer(
             {"user": user, "token": str(token)}
@@ -56,7 +64,9 @@ class LogoutView(APIView):
                 token.blacklist()
             except Exception:
                 return Response({"detail": "Invalid refresh token."}, status=status.HTTP_400_BAD_REQUEST)
-        logout(request)
+        invalidate_user(request.user.pk)
+        if not settings.AUTH_STATELESS_API:
+            logout(request)
         return Response(status=status.HTTP_200_OK)
 
 
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('borrow', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='borrowrequest',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='borrow_borr_status_9a3462_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='borrowrequest',
+            index=models.Index(fields=['created_at', 'id'], name='borrow_borr_created_1bdbab_idx'),
+        ),
+    ]
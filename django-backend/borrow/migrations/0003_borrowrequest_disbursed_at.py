@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('borrow', '0002_borrowrequest_queue_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='borrowrequest',
+            name='disbursed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:42
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def _sum(queryset):
+    return Coalesce(
+        Subquery(
+            queryset.values('borrow_request').annotate(total=Sum('amount_cents')).values('total')
+        ),
+        Value(0),
+    )
+
+
+def seed_repayment_totals(apps, schema_editor):
+    BorrowRequest = apps.get_model('borrow', 'BorrowRequest')
+    RepaymentScheduleItem = apps.get_model('repayments', 'RepaymentScheduleItem')
+    RepaymentPayment = apps.get_model('repayments', 'RepaymentPayment')
+    BorrowRequest.objects.update(
+        total_due_cents=_sum(RepaymentScheduleItem.objects.filter(borrow_request=OuterRef('pk'))),
+        total_paid_cents=_sum(
+            RepaymentPayment.objects.filter(borrow_request=OuterRef('pk'), status='PAID')
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('borrow', '0003_borrowrequest_disbursed_at'),
+        ('repayments', '0004_repaymentdistribution'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='borrowrequest',
+            name='total_due_cents',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='borrowrequest',
+            name='total_paid_cents',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.RunPython(seed_repayment_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('borrow', '0004_borrowrequest_repayment_totals'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='borrowrequest',
+            name='late_item_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
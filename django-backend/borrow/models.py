@@ -44,9 +44,19 @@ class BorrowRequest(models.Model):
     admin_note_internal = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    disbursed_at = models.DateTimeField(null=True, blank=True)
+    # Maintained by schedule generation and the repayment webhook; verified by
+    # `manage.py verify_repayment_totals`.
+    total_due_cents = models.PositiveBigIntegerField(default=0)
+    total_paid_cents = models.PositiveBigIntegerField(default=0)
+    late_item_count = models.PositiveIntegerField(default=0)
 
     class Meta:
-        indexes = [models.Index(fields=["status"])]
+        indexes = [
+            models.Index(fields=["status"]),
+            models.Index(fields=["status", "created_at", "id"]),
+            models.Index(fields=["created_at", "id"]),
+        ]
 
 
 class BorrowDocument(models.Model):
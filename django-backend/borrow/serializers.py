@@ -1,5 +1,8 @@
+from functools import partial
+
 from rest_framework import serializers
 
+from core.projections import Projection
 from core.serializers import CamelCaseSerializerMixin
 from core.utils import parse_prefixed_id, prefixed_id
 
@@ -120,6 +123,11 @@ class AdminBorrowRequestListSerializer(CamelCaseSerializerMixin, serializers.Mod
         return prefixed_id("br", obj.id)
 
 
+ADMIN_BORROW_REQUEST_LIST = Projection(
+    AdminBorrowRequestListSerializer, methods={"id": ("id", partial(prefixed_id, "br"))}
+)
+
+
 class AdminBorrowRequestDetailSerializer(CamelCaseSerializerMixin, serializers.ModelSerializer):
     id = serializers.SerializerMethodField()
     requester_id = serializers.UUIDField(source="requester.id", read_only=True)
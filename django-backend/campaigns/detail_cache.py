@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _version_key(campaign_id):
+    return f"campaign:{campaign_id}:version"
+
+
+def _payload_key(campaign_id, version):
+    return f"campaign:{campaign_id}:detail:{version}"
+
+
+def _read_version(campaign_id):
+    from campaigns.models import Campaign
+
+    return Campaign.objects.filter(id=campaign_id).values_list("version", "updated_at").first()
+
+
+def _store_version(campaign_id):
+    row = _read_version(campaign_id)
+    if row is None:
+        cache.delete(_version_key(campaign_id))
+    else:
+        cache.set(_version_key(campaign_id), row, settings.CAMPAIGN_DETAIL_CACHE_TIMEOUT)
+
+
+def get_campaign_version(campaign_id):
+    """Return (version, updated_at) for a campaign, or None if it does not exist."""
+    key = _version_key(campaign_id)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    row = _read_version(campaign_id)
+    if row is None:
+        return None
+    # add, not set: a writer that committed after this read has already stored
+    # the newer version, which this stale row must not replace.
+    cache.add(key, row, settings.CAMPAIGN_DETAIL_CACHE_TIMEOUT)
+    return row
+
+
+def get_cached_payload(campaign_id, version):
+    return cache.get(_payload_key(campaign_id, version))
+
+
+def set_cached_payload(campaign_id, version, payload):
+    cache.set(_payload_key(campaign_id, version), payload, settings.CAMPAIGN_DETAIL_CACHE_TIMEOUT)
+
+
+def invalidate_campaign(campaign_id):
+    """
+    Once the surrounding transaction commits, overwrite the cached version
+    pointer with the committed one. Deleting it instead would let a reader that
+    read the old row before the commit put it back for the full timeout.
+    """
+    transaction.on_commit(lambda: _store_version(campaign_id))
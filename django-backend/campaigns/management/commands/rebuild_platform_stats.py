@@ -0,0 +1,20 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from campaigns.models import PlatformStats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the platform stats row from the campaigns table."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            stats = PlatformStats.objects.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Platform stats rebuilt: "
+                f"{stats.active_campaign_count} active, "
+                f"{stats.total_needed_cents} needed, "
+                f"{stats.total_pooled_cents} pooled (cents)."
+            )
+        )
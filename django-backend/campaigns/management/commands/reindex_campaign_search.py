@@ -0,0 +1,45 @@
+from django.core.management import BaseCommand
+from django.db import connection, transaction
+
+from campaigns.models import Campaign
+from campaigns.search import SEARCH_FIELDS, get_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the campaign full-text search index."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        if backend is None:
+            self.stdout.write(f"No search index for the {connection.vendor} backend.")
+            return
+
+        batch_size = options["batch_size"]
+        if backend.clear_on_rebuild:
+            with transaction.atomic():
+                backend.clear(connection)
+                indexed = self._index_all(backend, batch_size)
+        else:
+            indexed = self._index_all(backend, batch_size)
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} campaigns."))
+
+    def _index_all(self, backend, batch_size):
+        # Each batch commits on its own unless the caller holds a transaction.
+        indexed = 0
+        last_id = None
+        while True:
+            qs = Campaign.objects.order_by("id")
+            if last_id is not None:
+                qs = qs.filter(id__gt=last_id)
+            rows = list(qs.values_list("id", *SEARCH_FIELDS)[:batch_size])
+            if not rows:
+                break
+            with transaction.atomic():
+                backend.index_rows(connection, rows)
+            indexed += len(rows)
+            last_id = rows[-1][0]
+        return indexed
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:57
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def seed_platform_stats(apps, schema_editor):
+    Campaign = apps.get_model('campaigns', 'Campaign')
+    PlatformStats = apps.get_model('campaigns', 'PlatformStats')
+    totals = Campaign.objects.aggregate(
+        total_needed=Sum('amount_needed_cents'),
+        total_pooled=Sum('amount_pooled_cents'),
+        active=Count('id', filter=Q(status='RUNNING')),
+    )
+    PlatformStats.objects.update_or_create(
+        id=1,
+        defaults={
+            'total_needed_cents': totals['total_needed'] or 0,
+            'total_pooled_cents': totals['total_pooled'] or 0,
+            'active_campaign_count': totals['active'] or 0,
+        },
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlatformStats',
+            fields=[
+                ('id', models.PositiveSmallIntegerField(default=1, editable=False, primary_key=True, serialize=False)),
+                ('total_needed_cents', models.BigIntegerField(default=0)),
+                ('total_pooled_cents', models.BigIntegerField(default=0)),
+                ('active_campaign_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(seed_platform_stats, migrations.RunPython.noop),
+    ]
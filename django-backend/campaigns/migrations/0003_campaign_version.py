@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0002_platformstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaign',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:03
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('borrow', '0002_borrowrequest_queue_indexes'),
+        ('campaigns', '0003_campaign_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaign',
+            name='funding_progress_pct',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(amount_needed_cents__lte=0, then=models.Value(0)), models.When(amount_pooled_cents__gte=models.F('amount_needed_cents'), then=models.Value(100)), default=django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('amount_pooled_cents'), '*', models.Value(100)), '/', models.F('amount_needed_cents'))), output_field=models.IntegerField()),
+        ),
+        migrations.AddIndex(
+            model_name='campaign',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='campaigns_c_status_f5d2e6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='campaign',
+            index=models.Index(fields=['status', 'category', 'created_at', 'id'], name='campaigns_c_status_af0c67_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='campaign',
+            index=models.Index(fields=['status', 'funding_progress_pct', 'created_at', 'id'], name='campaigns_c_status_c343c4_idx'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:05
+
+from django.db import migrations
+
+# Frozen copies of campaigns.search as of this migration; later changes to the
+# live module must not change what this migration does.
+SEARCH_FIELDS = ('title_public', 'category', 'story_public')
+FTS_TABLE = 'campaigns_campaign_fts'
+POSTGRES_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(title_public, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(category, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(story_public, '')), 'C')"
+)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('ALTER TABLE campaigns_campaign ADD COLUMN search_vector tsvector')
+        schema_editor.execute(
+            'CREATE INDEX campaigns_campaign_search_gin '
+            'ON campaigns_campaign USING gin (search_vector)'
+        )
+        schema_editor.execute(
+            f'UPDATE campaigns_campaign SET search_vector = {POSTGRES_VECTOR_SQL}'
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5('
+            'campaign_id UNINDEXED, title_public, category, story_public, '
+            "tokenize='porter unicode61')"
+        )
+        Campaign = apps.get_model('campaigns', 'Campaign')
+        campaigns = Campaign.objects.using(schema_editor.connection.alias)
+        rows = [
+            # rowid: top 63 bits of the UUID; campaign_id: Django's SQLite UUID form.
+            (campaign_id.int >> 65, campaign_id.hex, *values)
+            for campaign_id, *values in campaigns.values_list('id', *SEARCH_FIELDS)
+        ]
+        with schema_editor.connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} '
+                '(rowid, campaign_id, title_public, category, story_public) '
+                'VALUES (%s, %s, %s, %s, %s)',
+                rows,
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS campaigns_campaign_search_gin')
+        schema_editor.execute('ALTER TABLE campaigns_campaign DROP COLUMN IF EXISTS search_vector')
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0004_campaign_browse_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
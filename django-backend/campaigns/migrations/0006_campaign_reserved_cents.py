@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:17
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def seed_reserved_cents(apps, schema_editor):
+    Campaign = apps.get_model('campaigns', 'Campaign')
+    Contribution = apps.get_model('payments', 'Contribution')
+    pledged = (
+        Contribution.objects.filter(campaign=OuterRef('pk'), status='PLEDGED')
+        .values('campaign')
+        .annotate(total=Sum('amount_cents'))
+        .values('total')
+    )
+    Campaign.objects.update(
+        reserved_cents=F('amount_pooled_cents') + Coalesce(Subquery(pledged), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0005_campaign_search_index'),
+        ('payments', '0002_webhookevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaign',
+            name='reserved_cents',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(seed_reserved_cents, migrations.RunPython.noop),
+    ]
@@ -3,11 +3,16 @@ from datetime import timedelta
 
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+from django.db.models.functions import Greatest
 from django.utils import timezone
 
 from borrow.models import BorrowRequest, Currency
 
+from .detail_cache import invalidate_campaign
+from .search import SEARCH_FIELDS, index_campaign, remove_campaigns
+
 
 class CampaignStatus(models.TextChoices):
     DRAFT = "DRAFT", "Draft"
@@ -19,6 +24,117 @@ class CampaignStatus(models.TextChoices):
     CANCELLED = "CANCELLED", "Cancelled"
 
 
+PUBLIC_CAMPAIGN_STATUSES = (
+    CampaignStatus.RUNNING,
+    CampaignStatus.FUNDED,
+    CampaignStatus.DISBURSED,
+    CampaignStatus.IN_REPAYMENT,
+    CampaignStatus.COMPLETED,
+)
+
+PLATFORM_STATS_ID = 1
+
+
+class PlatformStatsManager(models.Manager):
+    def current(self):
+        stats = self.filter(id=PLATFORM_STATS_ID).first()
+        if stats is None:
+            stats = self.rebuild()
+        return stats
+
+    def apply_delta(self, needed_cents=0, pooled_cents=0, active_count=0):
+        if not (needed_cents or pooled_cents or active_count):
+            return
+        updated = self.filter(id=PLATFORM_STATS_ID).update(
+            total_needed_cents=F("total_needed_cents") + needed_cents,
+            total_pooled_cents=F("total_pooled_cents") + pooled_cents,
+            active_campaign_count=F("active_campaign_count") + active_count,
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            # The row is missing; recompute it, which already includes this change.
+            self.rebuild()
+
+    def rebuild(self):
+        totals = Campaign.objects.aggregate(
+            total_needed=Sum("amount_needed_cents"),
+            total_pooled=Sum("amount_pooled_cents"),
+            active=Count("id", filter=Q(status=CampaignStatus.RUNNING)),
+        )
+        stats, _ = self.update_or_create(
+            id=PLATFORM_STATS_ID,
+            defaults={
+                "total_needed_cents": totals["total_needed"] or 0,
+                "total_pooled_cents": totals["total_pooled"] or 0,
+                "active_campaign_count": totals["active"] or 0,
+            },
+        )
+        return stats
+
+
+class PlatformStats(models.Model):
+    """Single-row platform totals, kept in step with every campaign write."""
+
+    id = models.PositiveSmallIntegerField(
+        primary_key=True, default=PLATFORM_STATS_ID, editable=False
+    )
+    total_needed_cents = models.BigIntegerField(default=0)
+    total_pooled_cents = models.BigIntegerField(default=0)
+    active_campaign_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = PlatformStatsManager()
+
+
+STATS_FIELDS = ("amount_needed_cents", "amount_pooled_cents", "status")
+
+
+class CampaignManager(models.Manager):
+    def reserve(self, campaign_id, amount_cents):
+        """
+        Claim `amount_cents` of a running campaign's remaining capacity with one
+        conditional UPDATE. Returns False when the claim would pass the goal.
+        """
+        return bool(
+            self.filter(
+                id=campaign_id,
+                status=CampaignStatus.RUNNING,
+                reserved_cents__lte=F("amount_needed_cents") - amount_cents,
+            ).update(reserved_cents=F("reserved_cents") + amount_cents)
+        )
+
+    def force_reserve(self, campaign_id, amount_cents):
+        """Re-claim capacity for money that has already arrived, even past the goal."""
+        self.filter(id=campaign_id).update(reserved_cents=F("reserved_cents") + amount_cents)
+
+    def release(self, campaign_id, amount_cents):
+        self.filter(id=campaign_id).update(
+            reserved_cents=Greatest(F("reserved_cents") - amount_cents, Value(0))
+        )
+
+    def add_pooled(self, campaign_id, amount_cents):
+        """
+        Move a campaign's pooled amount by `amount_cents` without reading it
+        first, then flip a running campaign to FUNDED once it reaches its need.
+        Returns True when this call funded the campaign.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            self.filter(id=campaign_id).update(
+                amount_pooled_cents=F("amount_pooled_cents") + amount_cents,
+                version=F("version") + 1,
+                updated_at=now,
+            )
+            funded = self.filter(
+                id=campaign_id,
+                status=CampaignStatus.RUNNING,
+                amount_pooled_cents__gte=F("amount_needed_cents"),
+            ).update(status=CampaignStatus.FUNDED, updated_at=now)
+            PlatformStats.objects.apply_delta(pooled_cents=amount_cents, active_count=-funded)
+            invalidate_campaign(campaign_id)
+        return bool(funded)
+
+
 class Campaign(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     borrow_request = models.OneToOneField(
@@ -30,6 +146,8 @@ class Campaign(models.Model):
     category = models.CharField(max_length=100)
     amount_needed_cents = models.PositiveBigIntegerField(validators=[MinValueValidator(0)])
     amount_pooled_cents = models.PositiveBigIntegerField(default=0, validators=[MinValueValidator(0)])
+    # Pooled plus in-flight pledges; checkout claims capacity against the goal here.
+    reserved_cents = models.PositiveBigIntegerField(default=0, editable=False)
     expected_return_days = models.PositiveIntegerField(validators=[MinValueValidator(0)])
     expected_return_date = models.DateField(null=True, blank=True)
     currency = models.CharField(max_length=3, choices=Currency.choices, default=Currency.EUR)
@@ -37,19 +155,115 @@ class Campaign(models.Model):
         max_length=20, choices=CampaignStatus.choices, default=CampaignStatus.DRAFT
     )
     verified = models.BooleanField(default=False)
+    version = models.PositiveIntegerField(default=1, editable=False)
+    # Same clamped 0-100 integer as core.utils.funding_progress_pct, stored so
+    # the browse endpoint can sort and seek on it through an index.
+    funding_progress_pct = models.GeneratedField(
+        expression=Case(
+            When(amount_needed_cents__lte=0, then=Value(0)),
+            When(amount_pooled_cents__gte=F("amount_needed_cents"), then=Value(100)),
+            default=F("amount_pooled_cents") * 100 / F("amount_needed_cents"),
+        ),
+        output_field=models.IntegerField(),
+        db_persist=True,
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CampaignManager()
+
     class Meta:
-        indexes = [models.Index(fields=["status"])]
+        indexes = [
+            models.Index(fields=["status"]),
+            models.Index(fields=["status", "created_at", "id"]),
+            models.Index(fields=["status", "category", "created_at", "id"]),
+            models.Index(fields=["status", "funding_progress_pct", "created_at", "id"]),
+        ]
 
     def clean(self):
-        if self.amount_pooled_cents > self.amount_needed_cents:
+        # A payment for an expired pledge whose capacity was taken again still
+        # lands in the pool (payments.webhooks), so the pool may pass the goal.
+        # Only writes that change the amounts themselves are held to it.
+        snapshot = getattr(self, "_stats_snapshot", {})
+        amounts_changed = self._state.adding or any(
+            snapshot.get(name) != getattr(self, name)
+            for name in ("amount_needed_cents", "amount_pooled_cents")
+        )
+        if amounts_changed and self.amount_pooled_cents > self.amount_needed_cents:
             raise ValidationError("amount_pooled_cents cannot exceed amount_needed_cents.")
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stats_snapshot = {
+            name: value for name, value in zip(field_names, values) if name in STATS_FIELDS
+        }
+        return instance
+
+    def _stats_delta(self, update_fields=None):
+        if self._state.adding:
+            return {
+                "needed_cents": self.amount_needed_cents or 0,
+                "pooled_cents": self.amount_pooled_cents or 0,
+                "active_count": int(self.status == CampaignStatus.RUNNING),
+            }
+        snapshot = getattr(self, "_stats_snapshot", {})
+        if update_fields is not None:
+            snapshot = {name: value for name, value in snapshot.items() if name in update_fields}
+        delta = {"needed_cents": 0, "pooled_cents": 0, "active_count": 0}
+        if "amount_needed_cents" in snapshot:
+            delta["needed_cents"] = self.amount_needed_cents - snapshot["amount_needed_cents"]
+        if "amount_pooled_cents" in snapshot:
+            delta["pooled_cents"] = self.amount_pooled_cents - snapshot["amount_pooled_cents"]
+        if "status" in snapshot:
+            was_running = snapshot["status"] == CampaignStatus.RUNNING
+            delta["active_count"] = int(self.status == CampaignStatus.RUNNING) - int(was_running)
+        return delta
+
     def save(self, *args, **kwargs):
         if self.expected_return_date is None and self.expected_return_days is not None:
             base_date = self.created_at.date() if self.created_at else timezone.now().date()
             self.expected_return_date = base_date + timedelta(days=self.expected_return_days)
         self.full_clean()
-        super().save(*args, **kwargs)
+        update_fields = kwargs.get("update_fields")
+        bump_version = not self._state.adding
+        reindex = update_fields is None or not set(SEARCH_FIELDS).isdisjoint(update_fields)
+        refresh = ["version"]
+        if bump_version:
+            self.version = F("version") + 1
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "version", "updated_at"}
+        with transaction.atomic():
+            delta = self._stats_delta(update_fields)
+            # The reservation counter includes the pool; pledges move it with
+            # UPDATEs, so it is written relative to the row, never overwritten.
+            if self._state.adding:
+                self.reserved_cents = max(self.reserved_cents, self.amount_pooled_cents)
+            elif update_fields is None or "amount_pooled_cents" in update_fields:
+                self.reserved_cents = Greatest(
+                    F("reserved_cents") + delta["pooled_cents"], Value(0)
+                )
+                refresh.append("reserved_cents")
+                if update_fields is not None:
+                    kwargs["update_fields"].add("reserved_cents")
+            super().save(*args, **kwargs)
+            PlatformStats.objects.apply_delta(**delta)
+            if reindex:
+                index_campaign(self)
+            invalidate_campaign(self.id)
+        if bump_version:
+            self.refresh_from_db(fields=refresh)
+        self._stats_snapshot = {name: getattr(self, name) for name in STATS_FIELDS}
+
+    def delete(self, *args, **kwargs):
+        campaign_id = self.id
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            remove_campaigns([campaign_id])
+            invalidate_campaign(campaign_id)
+            PlatformStats.objects.apply_delta(
+                needed_cents=-self.amount_needed_cents,
+                pooled_cents=-self.amount_pooled_cents,
+                active_count=-int(self.status == CampaignStatus.RUNNING),
+            )
+        return result
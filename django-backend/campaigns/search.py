@@ -0,0 +1,195 @@
+"""
+Full-text search over public campaign text.
+
+Postgres keeps a weighted `search_vector` tsvector column on the campaign table
+behind a GIN index. SQLite keeps an FTS5 shadow table keyed by a rowid derived
+from the campaign UUID. Both are written from Campaign.save/delete and can be
+rebuilt with `manage.py reindex_campaign_search`.
+"""
+import re
+
+from django.db import connection
+
+SEARCH_FIELDS = ("title_public", "category", "story_public")
+FTS_TABLE = "campaigns_campaign_fts"
+MAX_TERMS = 8
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def search_terms(query):
+    return _TOKEN_RE.findall((query or "").lower())[:MAX_TERMS]
+
+
+class PostgresSearchBackend:
+    # The vector lives on the campaign row and index_rows overwrites it, so a
+    # rebuild goes batch by batch in place. Clearing first would row-lock every
+    # campaign until the whole rebuild commits.
+    clear_on_rebuild = False
+
+    vector_sql = (
+        "setweight(to_tsvector('english', coalesce(title_public, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(category, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(story_public, '')), 'C')"
+    )
+
+    def create_schema(self, schema_editor):
+        schema_editor.execute("ALTER TABLE campaigns_campaign ADD COLUMN search_vector tsvector")
+        schema_editor.execute(
+            "CREATE INDEX campaigns_campaign_search_gin "
+            "ON campaigns_campaign USING gin (search_vector)"
+        )
+
+    def drop_schema(self, schema_editor):
+        schema_editor.execute("DROP INDEX IF EXISTS campaigns_campaign_search_gin")
+        schema_editor.execute("ALTER TABLE campaigns_campaign DROP COLUMN IF EXISTS search_vector")
+
+    def index_rows(self, conn, rows):
+        ids = [row[0] for row in rows]
+        if not ids:
+            return
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE campaigns_campaign SET search_vector = {self.vector_sql} "
+                "WHERE id = ANY(%s)",
+                [ids],
+            )
+
+    def clear(self, conn):
+        with conn.cursor() as cursor:
+            cursor.execute("UPDATE campaigns_campaign SET search_vector = NULL")
+
+    def remove(self, conn, campaign_ids):
+        # The vector lives on the campaign row and goes away with it.
+        return
+
+    def search(self, conn, terms, statuses, limit):
+        tsquery = " & ".join(f"{term}:*" for term in terms)
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT id FROM campaigns_campaign, to_tsquery('english', %s) query "
+                "WHERE search_vector @@ query AND status = ANY(%s) "
+                "ORDER BY ts_rank(search_vector, query) DESC, created_at DESC LIMIT %s",
+                [tsquery, list(statuses), limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class SqliteSearchBackend:
+    # The FTS5 shadow table is rebuilt by emptying and refilling it in one
+    # transaction; campaign rows are never locked by it.
+    clear_on_rebuild = True
+
+    def create_schema(self, schema_editor):
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            "campaign_id UNINDEXED, title_public, category, story_public, "
+            "tokenize='porter unicode61')"
+        )
+
+    def drop_schema(self, schema_editor):
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+    @staticmethod
+    def _rowid(campaign_id):
+        # Top 63 bits of the UUID: a stable integer key, so updates and deletes
+        # hit the FTS rowid index instead of scanning the campaign_id column.
+        return campaign_id.int >> 65
+
+    @staticmethod
+    def _db_id(campaign_id):
+        # Matches how Django stores UUIDField values on SQLite (32 hex chars).
+        return campaign_id.hex
+
+    def index_rows(self, conn, rows):
+        if not rows:
+            return
+        with conn.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid = %s",
+                [(self._rowid(row[0]),) for row in rows],
+            )
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} "
+                "(rowid, campaign_id, title_public, category, story_public) "
+                "VALUES (%s, %s, %s, %s, %s)",
+                [(self._rowid(row[0]), self._db_id(row[0]), *row[1:]) for row in rows],
+            )
+
+    def clear(self, conn):
+        with conn.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+
+    def remove(self, conn, campaign_ids):
+        with conn.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid = %s",
+                [(self._rowid(campaign_id),) for campaign_id in campaign_ids],
+            )
+
+    def search(self, conn, terms, statuses, limit):
+        match = " ".join(f'"{term}"*' for term in terms)
+        placeholders = ", ".join(["%s"] * len(statuses))
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"SELECT c.id FROM {FTS_TABLE} f "
+                "JOIN campaigns_campaign c ON c.id = f.campaign_id "
+                f"WHERE {FTS_TABLE} MATCH %s AND c.status IN ({placeholders}) "
+                f"ORDER BY bm25({FTS_TABLE}, 0.0, 10.0, 5.0, 1.0), c.created_at DESC LIMIT %s",
+                [match, *statuses, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+BACKENDS = {
+    "postgresql": PostgresSearchBackend(),
+    "sqlite": SqliteSearchBackend(),
+}
+
+
+def get_backend(conn=None):
+    return BACKENDS.get((conn or connection).vendor)
+
+
+def index_campaign(campaign):
+    backend = get_backend()
+    if backend is not None:
+        row = (campaign.id, *(getattr(campaign, name) for name in SEARCH_FIELDS))
+        backend.index_rows(connection, [row])
+
+
+def remove_campaigns(campaign_ids):
+    backend = get_backend()
+    if backend is not None:
+        backend.remove(connection, campaign_ids)
+
+
+def search_campaigns(query, statuses, limit=20, fields=None):
+    """
+    Return campaigns matching `query`, best match first. With `fields` (which
+    must include "id") the matches are `values()` dicts of just those columns.
+    """
+    from campaigns.models import Campaign
+
+    terms = search_terms(query)
+    if not terms:
+        return []
+    backend = get_backend()
+    if backend is None:
+        qs = Campaign.objects.filter(status__in=statuses)
+        for term in terms:
+            qs = qs.filter(title_public__icontains=term)
+        if fields:
+            qs = qs.values(*fields)
+        return list(qs.order_by("-created_at")[:limit])
+
+    ids = [
+        Campaign._meta.pk.to_python(value)
+        for value in backend.search(connection, terms, list(statuses), limit)
+    ]
+    if fields:
+        rows = Campaign.objects.filter(id__in=ids).values(*fields)
+        campaigns = {row["id"]: row for row in rows}
+    else:
+        campaigns = Campaign.objects.in_bulk(ids)
+    return [campaigns[pk] for pk in ids if pk in campaigns]
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 
 from campaigns.models import Campaign
+from core.projections import Projection
 from payments.models import Contribution
 from borrow.models import BorrowRequest
 
@@ -49,6 +50,10 @@ class CampaignCardSerializer(serializers.ModelSerializer):
         ]
 
 
+# Card lists read only the card columns through this, never model instances.
+CAMPAIGN_CARDS = Projection(CampaignCardSerializer)
+
+
 class CampaignDetailSerializer(serializers.ModelSerializer):
     """Detailed serializer for a campaign (used by core/api_serializers imports)."""
 
@@ -1,3 +1,238 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
 
-# Create your tests here.
+from campaigns.detail_cache import get_campaign_version
+from campaigns.models import Campaign, CampaignStatus, PlatformStats
+from campaigns.search import SqliteSearchBackend
+from core.utils import funding_progress_pct
+
+
+def make_campaign(**overrides):
+    fields = {
+        "title_public": "Campaign",
+        "story_public": "Story",
+        "terms_public": "Terms",
+        "category": "medical",
+        "amount_needed_cents": 10000,
+        "amount_pooled_cents": 0,
+        "expected_return_days": 30,
+        "status": CampaignStatus.RUNNING,
+        "verified": True,
+    }
+    fields.update(overrides)
+    return Campaign.objects.create(**fields)
+
+
+class PlatformStatsTests(TestCase):
+    def test_stats_follow_campaign_writes(self):
+        campaign = make_campaign(amount_pooled_cents=2500)
+        make_campaign(amount_needed_cents=5000, status=CampaignStatus.COMPLETED)
+
+        stats = PlatformStats.objects.current()
+        self.assertEqual(stats.total_needed_cents, 15000)
+        self.assertEqual(stats.total_pooled_cents, 2500)
+        self.assertEqual(stats.active_campaign_count, 1)
+
+        campaign.amount_pooled_cents = 10000
+        campaign.status = CampaignStatus.FUNDED
+        campaign.save(update_fields=["amount_pooled_cents", "status"])
+
+        stats = PlatformStats.objects.current()
+        self.assertEqual(stats.total_pooled_cents, 10000)
+        self.assertEqual(stats.active_campaign_count, 0)
+
+        campaign.delete()
+        stats = PlatformStats.objects.current()
+        self.assertEqual(stats.total_needed_cents, 5000)
+        self.assertEqual(stats.total_pooled_cents, 0)
+
+    def test_rebuild_command_recovers_from_drift(self):
+        make_campaign(amount_pooled_cents=4000)
+        PlatformStats.objects.update(total_pooled_cents=0, active_campaign_count=7)
+
+        call_command("rebuild_platform_stats", stdout=StringIO())
+
+        stats = PlatformStats.objects.current()
+        self.assertEqual(stats.total_pooled_cents, 4000)
+        self.assertEqual(stats.active_campaign_count, 1)
+
+    def test_home_stats_are_read_in_constant_queries(self):
+        make_campaign()
+        with self.assertNumQueries(3):
+            self.client.get("/api/v1/home")
+        for _ in range(5):
+            make_campaign()
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/v1/home")
+        self.assertEqual(response.json()["stats"]["activeCampaignCount"], 6)
+
+
+class CampaignDetailCacheTests(TestCase):
+    def setUp(self):
+        self.campaign = make_campaign(title_public="Cached")
+        self.url = f"/api/v1/campaigns/c_{self.campaign.id}"
+
+    def test_etag_and_conditional_get(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertIn("Last-Modified", response)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_repeat_reads_skip_query_and_serialization(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["campaign"]["title_public"], "Cached")
+
+    def test_save_bumps_version_and_invalidates(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.campaign.title_public = "Renamed"
+            self.campaign.save(update_fields=["title_public"])
+        self.assertEqual(self.campaign.version, 2)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.json()["campaign"]["title_public"], "Renamed")
+
+    def test_reader_racing_a_write_cannot_restore_old_version(self):
+        cache.clear()
+        fill = cache.add
+
+        def fill_after_concurrent_write(*args, **kwargs):
+            # The write commits between this reader's row read and its fill.
+            with self.captureOnCommitCallbacks(execute=True):
+                Campaign.objects.get(pk=self.campaign.pk).save(update_fields=["title_public"])
+            return fill(*args, **kwargs)
+
+        with patch.object(cache, "add", side_effect=fill_after_concurrent_write):
+            self.assertEqual(get_campaign_version(self.campaign.id)[0], 1)
+        self.assertEqual(get_campaign_version(self.campaign.id)[0], 2)
+
+    def test_unknown_campaign_is_404(self):
+        response = self.client.get("/api/v1/campaigns/c_00000000-0000-0000-0000-000000000000")
+        self.assertEqual(response.status_code, 404)
+
+
+class CampaignBrowseTests(TestCase):
+    def setUp(self):
+        self.low = make_campaign(title_public="Low", amount_pooled_cents=1000)
+        self.high = make_campaign(title_public="High", amount_pooled_cents=9000, category="rent")
+        self.mid = make_campaign(title_public="Mid", amount_pooled_cents=5000)
+        make_campaign(title_public="Draft", status=CampaignStatus.DRAFT)
+        make_campaign(title_public="Done", status=CampaignStatus.COMPLETED)
+
+    def _titles(self, response):
+        return [item["title_public"] for item in response.json()["results"]]
+
+    def test_defaults_to_running_newest_first(self):
+        response = self.client.get("/api/v1/campaigns")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._titles(response), ["Mid", "High", "Low"])
+        self.assertIsNone(response.json()["nextCursor"])
+
+    def test_filters_and_progress_sort(self):
+        response = self.client.get("/api/v1/campaigns", {"sort": "progress"})
+        self.assertEqual(self._titles(response), ["High", "Mid", "Low"])
+
+        response = self.client.get("/api/v1/campaigns", {"category": "rent"})
+        self.assertEqual(self._titles(response), ["High"])
+
+        response = self.client.get("/api/v1/campaigns", {"status": "COMPLETED"})
+        self.assertEqual(self._titles(response), ["Done"])
+
+        response = self.client.get("/api/v1/campaigns", {"status": "DRAFT"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_walks_every_page(self):
+        titles = []
+        params = {"sort": "progress", "limit": 2}
+        while True:
+            response = self.client.get("/api/v1/campaigns", params)
+            titles.extend(self._titles(response))
+            cursor = response.json()["nextCursor"]
+            if cursor is None:
+                break
+            params["cursor"] = cursor
+        self.assertEqual(titles, ["High", "Mid", "Low"])
+
+    def test_stored_progress_matches_python_helper(self):
+        for pooled, needed in [(29, 100), (57, 100), (87, 300), (203, 700), (0, 0)]:
+            make_campaign(amount_pooled_cents=pooled, amount_needed_cents=needed)
+        # Late payments may carry the pool past the goal.
+        Campaign.objects.filter(pk=self.low.pk).update(amount_pooled_cents=15000)
+        for campaign in Campaign.objects.all():
+            self.assertEqual(
+                campaign.funding_progress_pct,
+                funding_progress_pct(campaign.amount_pooled_cents, campaign.amount_needed_cents),
+            )
+
+
+class CampaignSearchTests(TestCase):
+    def setUp(self):
+        self.title_hit = make_campaign(title_public="Surgery for Amira")
+        self.story_hit = make_campaign(
+            title_public="Help needed", story_public="Costs after knee surgery"
+        )
+        make_campaign(title_public="Rent support", category="rent")
+        make_campaign(title_public="Surgery draft", status=CampaignStatus.DRAFT)
+
+    def _titles(self, params):
+        response = self.client.get("/api/v1/campaigns/search", params)
+        self.assertEqual(response.status_code, 200)
+        return [item["title_public"] for item in response.json()["results"]]
+
+    def test_title_matches_rank_above_story_matches(self):
+        self.assertEqual(self._titles({"q": "surgery"}), ["Surgery for Amira", "Help needed"])
+
+    def test_prefix_and_stemmed_terms_match(self):
+        self.assertEqual(self._titles({"q": "surg"}), ["Surgery for Amira", "Help needed"])
+        self.assertEqual(self._titles({"q": "knees cost"}), ["Help needed"])
+        self.assertEqual(self._titles({"q": ""}), [])
+
+    def test_status_filter(self):
+        self.assertEqual(self._titles({"q": "surgery", "status": "COMPLETED"}), [])
+        response = self.client.get("/api/v1/campaigns/search", {"q": "x", "status": "DRAFT"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_index_follows_edits_and_deletes(self):
+        self.title_hit.title_public = "Dialysis for Amira"
+        self.title_hit.save(update_fields=["title_public"])
+        self.assertEqual(self._titles({"q": "dialysis"}), ["Dialysis for Amira"])
+        self.assertEqual(self._titles({"q": "surgery"}), ["Help needed"])
+
+        self.story_hit.delete()
+        self.assertEqual(self._titles({"q": "surgery"}), [])
+
+    def test_reindex_command_rebuilds_index(self):
+        Campaign.objects.filter(pk=self.story_hit.pk).update(title_public="Bulk edited")
+        out = StringIO()
+        call_command("reindex_campaign_search", batch_size=2, stdout=out)
+        self.assertIn("Indexed 4 campaigns.", out.getvalue())
+        self.assertEqual(self._titles({"q": "bulk"}), ["Bulk edited"])
+
+    def test_in_place_reindex_skips_clear(self):
+        # The Postgres path: rows are overwritten batch by batch, never cleared.
+        Campaign.objects.filter(pk=self.story_hit.pk).update(title_public="Bulk edited")
+        with patch.object(SqliteSearchBackend, "clear_on_rebuild", False), patch.object(
+            SqliteSearchBackend, "clear"
+        ) as clear:
+            call_command("reindex_campaign_search", batch_size=2, stdout=StringIO())
+        clear.assert_not_called()
+        self.assertEqual(self._titles({"q": "bulk"}), ["Bulk edited"])
+        self.assertEqual(self._titles({"q": "surgery"}), ["Surgery for Amira", "Bulk edited"])
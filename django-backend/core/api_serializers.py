@@ -1,10 +1,16 @@
+from django.db.models import Q, Sum
 from rest_framework import serializers
 
-from campaigns.models import Campaign
-from payments.models import Contribution
+from campaigns.models import Campaign, PlatformStats
+from payments.models import Contribution, ContributionStatus
 from borrow.models import BorrowRequest
 
-from campaigns.serializers import CampaignCardSerializer, CampaignDetailSerializer
+from campaigns.serializers import (
+    CAMPAIGN_CARDS,
+    CampaignCardSerializer,
+    CampaignDetailSerializer,
+)
+from core.projections import Projection
 
 
 class HomeResponseSerializer(serializers.Serializer):
@@ -14,21 +20,19 @@ class HomeResponseSerializer(serializers.Serializer):
 
     def to_representation(self, instance):
         campaigns = instance.get("campaigns", Campaign.objects.none())
+        stats = instance.get("stats") or PlatformStats.objects.current()
 
         running = campaigns.filter(status="RUNNING").order_by("-id")[:5]
         completed = campaigns.filter(status="COMPLETED").order_by("-id")[:5]
 
-        total_needed = sum((c.amount_needed_cents or 0) for c in campaigns)
-        total_pooled = sum((c.amount_pooled_cents or 0) for c in campaigns)
-
         return {
             "stats": {
-                "activeCampaignCount": running.count(),
-                "totalNeededCents": total_needed,
-                "totalPooledCents": total_pooled,
+                "activeCampaignCount": stats.active_campaign_count,
+                "totalNeededCents": stats.total_needed_cents,
+                "totalPooledCents": stats.total_pooled_cents,
             },
-            "running_campaigns": CampaignCardSerializer(running, many=True).data,
-            "completed_campaigns": CampaignCardSerializer(completed, many=True).data,
+            "running_campaigns": CAMPAIGN_CARDS.serialize(running),
+            "completed_campaigns": CAMPAIGN_CARDS.serialize(completed),
         }
 
 
@@ -51,6 +55,9 @@ class BorrowRequestSummarySerializer(serializers.ModelSerializer):
         ]
 
 
+BORROW_REQUEST_SUMMARIES = Projection(BorrowRequestSummarySerializer)
+
+
 class DashboardResponseSerializer(serializers.Serializer):
     support_summary = serializers.DictField()
     support_by_campaign = serializers.ListField()
@@ -60,30 +67,40 @@ class DashboardResponseSerializer(serializers.Serializer):
         contributions = instance.get("contributions", Contribution.objects.none())
         borrow_requests = instance.get("borrow_requests", BorrowRequest.objects.none())
 
-        total_supported = sum((c.amount_cents or 0) for c in contributions)
-        returned = sum((c.amount_cents or 0) for c in contributions.filter(status="RETURNED"))
-        active = sum((c.amount_cents or 0) for c in contributions.filter(status="PAID"))
-
-        by_campaign = []
-        for c in contributions:
-            by_campaign.append(
-                {
-                    "campaign_id": getattr(c.campaign, "id", None),
-                    "campaign_title": getattr(c.campaign, "title_public", ""),
-                    "campaign_status": getattr(c.campaign, "status", ""),
-                    "amount_cents": c.amount_cents,
-                    "currency": getattr(c, "currency", "EUR"),
-                    "contribution_status": getattr(c, "status", ""),
-                    "expected_return_date": getattr(c.campaign, "expected_return_date", None),
-                }
-            )
+        totals = contributions.aggregate(
+            total_supported=Sum("amount_cents"),
+            active=Sum("amount_cents", filter=Q(status=ContributionStatus.PAID)),
+            returned=Sum("amount_cents", filter=Q(status=ContributionStatus.RETURNED)),
+        )
+
+        rows = contributions.values(
+            "amount_cents",
+            "currency",
+            "status",
+            "campaign_id",
+            "campaign__title_public",
+            "campaign__status",
+            "campaign__expected_return_date",
+        )
+        by_campaign = [
+            {
+                "campaign_id": row["campaign_id"],
+                "campaign_title": row["campaign__title_public"],
+                "campaign_status": row["campaign__status"],
+                "amount_cents": row["amount_cents"],
+                "currency": row["currency"],
+                "contribution_status": row["status"],
+                "expected_return_date": row["campaign__expected_return_date"],
+            }
+            for row in rows
+        ]
 
         return {
             "support_summary": {
-                "total_supported_cents": total_supported,
-                "active_supported_cents": active,
-                "returned_cents": returned,
+                "total_supported_cents": totals["total_supported"] or 0,
+                "active_supported_cents": totals["active"] or 0,
+                "returned_cents": totals["returned"] or 0,
             },
             "support_by_campaign": by_campaign,
-            "borrow_requests": BorrowRequestSummarySerializer(borrow_requests, many=True).data,
+            "borrow_requests": BORROW_REQUEST_SUMMARIES.serialize(borrow_requests),
         }
@@ -1,19 +1,6 @@
 from rest_framework.views import exception_handler as drf_exception_handler
 
-
-def _to_camel_case(value):
-    if "_" not in value:
-        return value
-    parts = value.split("_")
-    return parts[0] + "".join(part[:1].upper() + part[1:] for part in parts[1:])
-
-
-def _transform_keys(data):
-    if isinstance(data, list):
-        return [_transform_keys(item) for item in data]
-    if isinstance(data, dict):
-        return {_to_camel_case(key): _transform_keys(value) for key, value in data.items()}
-    return data
+from core.serializers import camelize
 
 
 def exception_handler(exc, context):
@@ -22,7 +9,7 @@ def exception_handler(exc, context):
         return response
 
     message = "Request failed"
-    details = _transform_keys(response.data)
+    details = camelize(response.data)
     if isinstance(response.data, dict):
         message = response.data.get("detail", message)
 
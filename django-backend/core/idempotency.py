@@ -0,0 +1,123 @@
+"""
+`Idempotency-Key` support for POST endpoints that create rows and call Stripe.
+
+The first request with a key claims it by inserting an IN_PROGRESS row. When
+the view returns a non-5xx response, the response is stored on that row. A
+retry with the same key and body then gets the stored response back, with an
+`Idempotent-Replayed: true` header, without writing to the database or calling
+Stripe.
+
+A retry that arrives while the first request is still running gets 409. Reusing
+a key with a different body gets 422. If the view raises or returns a 5xx, the
+claim is dropped so the client can retry.
+
+An IN_PROGRESS claim expires after IDEMPOTENCY_CLAIM_TTL, so a key left behind
+by a worker killed mid-request can be claimed again; a completed response is
+kept for IDEMPOTENCY_KEY_TTL.
+"""
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey, IdempotencyKeyStatus
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+
+def _fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(f"{request.method} {request.path}\n{body}".encode()).hexdigest()
+
+
+def _in_progress():
+    return Response(
+        {"detail": "A request with this Idempotency-Key is still in progress."},
+        status=status.HTTP_409_CONFLICT,
+    )
+
+
+def _existing_response(record, fingerprint):
+    if record.fingerprint != fingerprint:
+        return Response(
+            {"detail": "Idempotency-Key was already used with a different request."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    if record.status != IdempotencyKeyStatus.COMPLETED:
+        return _in_progress()
+    return Response(
+        record.response_body, status=record.response_status, headers={REPLAYED_HEADER: "true"}
+    )
+
+
+def _claim(lookup, fingerprint, now):
+    """Return (record, None) if this request now holds the key, else (None, response)."""
+    for _ in range(2):
+        record = IdempotencyKey.objects.filter(**lookup, expires_at__gt=now).first()
+        if record is not None:
+            return None, _existing_response(record, fingerprint)
+        try:
+            with transaction.atomic():
+                IdempotencyKey.objects.filter(**lookup, expires_at__lte=now).delete()
+                record = IdempotencyKey.objects.create(
+                    **lookup,
+                    fingerprint=fingerprint,
+                    expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_CLAIM_TTL),
+                )
+            return record, None
+        except IntegrityError:
+            # Lost the race to a concurrent request with the same key. Look
+            # again: its claim may already be gone if its view failed.
+            continue
+    return None, _in_progress()
+
+
+def idempotent(view_method):
+    """Decorate an APIView handler so an `Idempotency-Key` header makes it safe to retry."""
+
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key or not request.user.is_authenticated:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {"detail": "Idempotency-Key is too long."}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        scope = type(self).__name__
+        fingerprint = _fingerprint(request)
+        now = timezone.now()
+        lookup = {"user": request.user, "scope": scope, "key": key}
+
+        record, response = _claim(lookup, fingerprint, now)
+        if record is None:
+            return response
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+        if response.status_code >= 500:
+            record.delete()
+            return response
+
+        # A no-op if the claim ran past its lease and another request took it.
+        IdempotencyKey.objects.filter(id=record.id).update(
+            status=IdempotencyKeyStatus.COMPLETED,
+            response_status=response.status_code,
+            response_body=response.data,
+            expires_at=timezone.now() + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+        )
+        return response
+
+    return wrapper
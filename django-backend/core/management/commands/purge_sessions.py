@@ -0,0 +1,25 @@
+from django.contrib.sessions.models import Session
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = "Delete Django session rows in batches: expired ones, or all with --all."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all", action="store_true", help="Also delete unexpired sessions (logs everyone out)."
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        sessions = Session.objects.all()
+        if not options["all"]:
+            sessions = sessions.filter(expire_date__lt=timezone.now())
+        deleted = 0
+        while True:
+            keys = list(sessions.values_list("session_key", flat=True)[: options["batch_size"]])
+            if not keys:
+                break
+            deleted += Session.objects.filter(session_key__in=keys).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} sessions."))
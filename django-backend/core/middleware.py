@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.contrib.sessions.backends.base import SessionBase
+from django.contrib.sessions.middleware import SessionMiddleware as DjangoSessionMiddleware
+
+
+class NullSession(SessionBase):
+    """A session that is always empty and never touches storage."""
+
+    def load(self):
+        return {}
+
+    def exists(self, session_key):
+        return False
+
+    def create(self):
+        return
+
+    def save(self, must_create=False):
+        return
+
+    def delete(self, session_key=None):
+        return
+
+    def cycle_key(self):
+        return
+
+    @classmethod
+    def clear_expired(cls):
+        return
+
+
+class SessionMiddleware(DjangoSessionMiddleware):
+    """
+    Django's SessionMiddleware, except that with AUTH_STATELESS_API on, requests
+    under AUTH_STATELESS_API_PREFIX get a NullSession: the API authenticates
+    with Bearer tokens only, so it never reads or writes django_session and
+    sets no session cookie. Other paths (the Django admin) keep real sessions.
+    """
+
+    def _stateless(self, request):
+        return settings.AUTH_STATELESS_API and request.path_info.startswith(
+            settings.AUTH_STATELESS_API_PREFIX
+        )
+
+    def process_request(self, request):
+        if self._stateless(request):
+            request.session = NullSession()
+            return
+        super().process_request(request)
+
+    def process_response(self, request, response):
+        if isinstance(getattr(request, "session", None), NullSession):
+            return response
+        return super().process_response(request, response)
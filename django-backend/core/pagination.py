@@ -0,0 +1,90 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import ParseError
+
+
+class KeysetPaginator:
+    """
+    Cursor pagination that seeks past the last row of the previous page.
+
+    `ordering` must end in a unique field (usually "-id") so the seek is exact.
+    The cursor is an opaque token holding the ordering values of that last row,
+    so every page is a single indexed range scan regardless of depth.
+    """
+
+    cursor_param = "cursor"
+    limit_param = "limit"
+
+    def __init__(self, ordering, page_size=50, max_page_size=200):
+        self.ordering = tuple(ordering)
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+
+    def paginate(self, queryset, request):
+        """Return (rows, next_cursor) for the page requested by `request`."""
+        limit = self._get_limit(request)
+        queryset = queryset.order_by(*self.ordering)
+        cursor = request.query_params.get(self.cursor_param)
+        if cursor:
+            queryset = queryset.filter(self._seek_filter(queryset.model, cursor))
+        rows = list(queryset[: limit + 1])
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self._encode(rows[-1])
+        return rows, next_cursor
+
+    def _get_limit(self, request):
+        try:
+            limit = int(request.query_params.get(self.limit_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(limit, self.max_page_size))
+
+    def _fields(self):
+        for item in self.ordering:
+            yield item.lstrip("-"), item.startswith("-")
+
+    def _encode(self, row):
+        values = []
+        for name, _ in self._fields():
+            value = row[name] if isinstance(row, dict) else getattr(row, name)
+            values.append(value.isoformat() if hasattr(value, "isoformat") else str(value))
+        raw = json.dumps(values, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def _decode(self, model, cursor):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            fields = list(self._fields())
+            if not isinstance(values, list) or len(values) != len(fields):
+                raise ValueError
+            return [
+                model._meta.get_field(name).to_python(value)
+                for (name, _), value in zip(fields, values)
+            ]
+        except (
+            binascii.Error,
+            UnicodeDecodeError,
+            json.JSONDecodeError,
+            ValueError,
+            TypeError,
+            KeyError,
+            ValidationError,
+        ) as exc:
+            raise ParseError("Invalid cursor.") from exc
+
+    def _seek_filter(self, model, cursor):
+        values = self._decode(model, cursor)
+        seek = Q()
+        equal = Q()
+        for (name, descending), value in zip(self._fields(), values):
+            lookup = "lt" if descending else "gt"
+            seek |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        return seek
@@ -0,0 +1,62 @@
+"""
+Read-only projections for hot list endpoints.
+
+A `Projection` wraps an existing output serializer. The serializer still
+declares the fields (and still drives the OpenAPI schema), but list endpoints
+fetch only those columns with `.values()` and turn each row dict into output
+with a precomputed (key, column, converter) plan: no model instances and no
+per-row DRF field lookups. The converters are the serializer's own bound
+fields' `to_representation`, so the JSON is the same as the serializer's.
+
+SerializerMethodFields have no column; give them one in `methods` together
+with a converter for its value.
+"""
+from functools import cached_property
+
+from django.db.models import QuerySet
+from rest_framework import serializers
+
+from core.serializers import CamelCaseSerializerMixin, snake_to_camel
+
+
+class Projection:
+    def __init__(self, serializer_class, methods=None):
+        self.serializer_class = serializer_class
+        self.methods = methods or {}
+
+    @cached_property
+    def plan(self):
+        # Built on first use: serializer fields need the app registry.
+        serializer = self.serializer_class()
+        camel = isinstance(serializer, CamelCaseSerializerMixin)
+        plan = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.SerializerMethodField):
+                column, convert = self.methods[name]
+            else:
+                column, convert = "__".join(field.source_attrs), field.to_representation
+            plan.append((snake_to_camel(name) if camel else name, column, convert))
+        return tuple(plan)
+
+    @property
+    def columns(self):
+        return tuple(dict.fromkeys(column for _, column, _ in self.plan))
+
+    def values(self, queryset, *extra):
+        """`queryset` narrowed to the projected columns plus `extra` ones."""
+        return queryset.values(*dict.fromkeys(self.columns + extra))
+
+    def to_representation(self, row):
+        # Like Serializer.to_representation, None is passed through unconverted.
+        return {
+            key: None if row[column] is None else convert(row[column])
+            for key, column, convert in self.plan
+        }
+
+    def serialize(self, rows):
+        """Output dicts for `rows`; a queryset is narrowed with `values()` first."""
+        if isinstance(rows, QuerySet):
+            rows = self.values(rows)
+        return [self.to_representation(row) for row in rows]
@@ -1,6 +1,9 @@
+from functools import lru_cache
+
 from rest_framework import serializers
 
 
+@lru_cache(maxsize=4096)
 def snake_to_camel(s: str) -> str:
     """
     Convert snake_case -> camelCase
@@ -10,31 +13,62 @@ def snake_to_camel(s: str) -> str:
     return parts[0] + "".join(p[:1].upper() + p[1:] for p in parts[1:])
 
 
+def camel_key(key):
+    # Only string keys are converted; e.g. ListField errors are keyed by index.
+    return snake_to_camel(key) if isinstance(key, str) else key
+
+
+def camelize(data):
+    """Recursively camelCase the keys of dicts, including those inside lists."""
+    if isinstance(data, dict):
+        return {camel_key(key): camelize(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [camelize(item) for item in data]
+    return data
+
+
+def _camelizes_itself(field):
+    if isinstance(field, serializers.ListSerializer):
+        field = field.child
+    return isinstance(field, CamelCaseSerializerMixin)
+
+
 class CamelCaseSerializerMixin:
     """
     Mixin for DRF serializers:
-    - Outputs keys in camelCase (frontend-friendly)
+    - Outputs keys in camelCase (frontend-friendly), nested dicts and lists included
     - Still accepts snake_case input normally (default DRF behavior)
 
     This is a lightweight utility used by other apps (e.g., borrow.serializers).
     """
 
+    def _camel_fields(self):
+        # Built once per serializer class: field name -> (camelCase name, whether
+        # the value still needs walking). Nested camelCase serializers have
+        # already converted their own output.
+        cls = type(self)
+        mapping = cls.__dict__.get("_camel_field_map")
+        if mapping is None:
+            mapping = {
+                name: (snake_to_camel(name), not _camelizes_itself(field))
+                for name, field in self.fields.items()
+            }
+            cls._camel_field_map = mapping
+        return mapping
+
     def to_representation(self, instance):
         data = super().to_representation(instance)
 
-        # Convert output dict keys to camelCase
         if isinstance(data, dict):
-            return {snake_to_camel(k): v for k, v in data.items()}
+            mapping = self._camel_fields()
+            out = {}
+            for key, value in data.items():
+                name, walk = mapping.get(key) or (camel_key(key), True)
+                out[name] = camelize(value) if walk else value
+            return out
 
-        # Convert list of dicts if any
         if isinstance(data, list):
-            out = []
-            for item in data:
-                if isinstance(item, dict):
-                    out.append({snake_to_camel(k): v for k, v in item.items()})
-                else:
-                    out.append(item)
-            return out
+            return camelize(data)
 
         return data
 
@@ -1,8 +1,27 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APITestCase
 
 from borrow.models import BorrowRequest, BorrowRequestStatus
+from borrow.serializers import ADMIN_BORROW_REQUEST_LIST, AdminBorrowRequestListSerializer
 from campaigns.models import Campaign, CampaignStatus
+from campaigns.serializers import CAMPAIGN_CARDS, CampaignCardSerializer
+from core.api_serializers import BORROW_REQUEST_SUMMARIES, BorrowRequestSummarySerializer
+from core.exception_handler import exception_handler
+from core.serializers import CamelCaseSerializer
+from core.throttling import LocalBucketStore
 from payments.models import Contribution, ContributionStatus, PaymentProvider
 
 
@@ -220,3 +239,246 @@ class DashboardEndpointTests(APITestCase):
         self.assertEqual(len(borrow_requests), 1)
         self.assertTrue(borrow_requests[0]["id"].startswith("br_"))
         self.assertEqual(borrow_requests[0]["title"], "Borrow A")
+
+    def test_dashboard_query_count_is_constant(self):
+        self.client.force_authenticate(user=self.user)
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/v1/dashboard")
+        self.assertEqual(response.status_code, 200)
+
+        Contribution.objects.bulk_create(
+            [
+                Contribution(
+                    contributor=self.user,
+                    campaign=self.running_campaign,
+                    amount_cents=100,
+                    currency="EUR",
+                    status=ContributionStatus.PAID,
+                    provider=PaymentProvider.STRIPE,
+                    provider_session_id=f"dash_bulk_{i}",
+                )
+                for i in range(50)
+            ]
+        )
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/v1/dashboard")
+        self.assertEqual(response.status_code, 200)
+
+
+class ThrottlingTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    def _rates(self, **rates):
+        return override_settings(
+            REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": rates}
+        )
+
+    def test_login_limited_per_email_before_hashing(self):
+        login = {"email": "victim@example.com", "password": "wrong"}
+        with self._rates(login_ip="10/min", login_email="2/min"), patch(
+            "accounts.serializers.authenticate", return_value=None
+        ) as mock_authenticate:
+            for _ in range(2):
+                self.assertEqual(self.client.post("/api/v1/auth/login", login).status_code, 400)
+            response = self.client.post("/api/v1/auth/login", login)
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(int(response["Retry-After"]), 30)
+            self.assertEqual(mock_authenticate.call_count, 2)
+
+            other = {"email": "other@example.com", "password": "wrong"}
+            self.assertEqual(self.client.post("/api/v1/auth/login", other).status_code, 400)
+
+    def test_public_reads_limited_per_ip(self):
+        with self._rates(public_ip="2/min"):
+            self.assertEqual(self.client.get("/api/v1/home").status_code, 200)
+            self.assertEqual(self.client.get("/api/v1/campaigns").status_code, 200)
+            self.assertEqual(self.client.get("/api/v1/home").status_code, 429)
+            response = self.client.get("/api/v1/home", REMOTE_ADDR="10.0.0.2")
+            self.assertEqual(response.status_code, 200)
+
+    def test_spoofed_forwarded_for_does_not_reset_bucket(self):
+        with self._rates(public_ip="2/min"):
+            for idx in range(2):
+                response = self.client.get("/api/v1/home", HTTP_X_FORWARDED_FOR=f"1.2.3.{idx}")
+                self.assertEqual(response.status_code, 200)
+            response = self.client.get("/api/v1/home", HTTP_X_FORWARDED_FOR="1.2.3.99")
+            self.assertEqual(response.status_code, 429)
+
+    def test_one_proxy_uses_the_address_it_appended(self):
+        rest_framework = {
+            **settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": {"public_ip": "2/min"},
+            "NUM_PROXIES": 1,
+        }
+        with override_settings(REST_FRAMEWORK=rest_framework):
+            for idx in range(2):
+                forwarded = f"1.2.3.{idx}, 10.0.0.7"
+                response = self.client.get("/api/v1/home", HTTP_X_FORWARDED_FOR=forwarded)
+                self.assertEqual(response.status_code, 200)
+            spoofed = "9.9.9.9, 10.0.0.7"
+            response = self.client.get("/api/v1/home", HTTP_X_FORWARDED_FOR=spoofed)
+            self.assertEqual(response.status_code, 429)
+            response = self.client.get("/api/v1/home", HTTP_X_FORWARDED_FOR="10.0.0.8")
+            self.assertEqual(response.status_code, 200)
+
+    def test_unconfigured_scope_is_not_throttled(self):
+        with self._rates():
+            for _ in range(5):
+                self.assertEqual(self.client.get("/api/v1/home").status_code, 200)
+
+    def test_local_bucket_refills(self):
+        store = LocalBucketStore()
+        with patch("core.throttling.time.monotonic", side_effect=[0, 0, 0, 30, 31]):
+            self.assertEqual(store.consume("k", 2, 60), 0)
+            self.assertEqual(store.consume("k", 2, 60), 0)
+            self.assertEqual(store.consume("k", 2, 60), 30)
+            self.assertEqual(store.consume("k", 2, 60), 0)
+            self.assertGreater(store.consume("k", 2, 60), 0)
+
+
+class StatelessSessionTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="stateless@example.com", password="StrongPass123", name="Stateless"
+        )
+        self.credentials = {"email": "stateless@example.com", "password": "StrongPass123"}
+
+    def test_api_login_writes_no_session(self):
+        response = self.client.post("/api/v1/auth/login", self.credentials, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        self.assertFalse(Session.objects.exists())
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.last_login)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['token']}")
+        self.assertEqual(self.client.post("/api/v1/auth/logout").status_code, 200)
+
+    @override_settings(AUTH_STATELESS_API=False)
+    def test_sessions_kept_when_disabled(self):
+        response = self.client.post("/api/v1/auth/login", self.credentials, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        self.assertEqual(Session.objects.count(), 1)
+
+    def test_purge_sessions(self):
+        now = timezone.now()
+        expire_dates = [now - timedelta(days=1)] * 3 + [now + timedelta(days=1)]
+        for idx, expire_date in enumerate(expire_dates):
+            Session.objects.create(
+                session_key=f"session{idx}", session_data="", expire_date=expire_date
+            )
+        out = StringIO()
+        call_command("purge_sessions", batch_size=2, stdout=out)
+        self.assertIn("Deleted 3 sessions.", out.getvalue())
+        call_command("purge_sessions", all=True, stdout=out)
+        self.assertFalse(Session.objects.exists())
+
+
+class CamelCaseTests(APITestCase):
+    class ItemSerializer(CamelCaseSerializer):
+        amount_cents = serializers.IntegerField()
+
+    class PageSerializer(CamelCaseSerializer):
+        page_items = serializers.SerializerMethodField()
+        extra_info = serializers.DictField()
+
+        def get_page_items(self, obj):
+            return CamelCaseTests.ItemSerializer(obj["items"], many=True).data
+
+    def test_nested_dicts_and_lists_are_converted(self):
+        data = self.PageSerializer(
+            {
+                "items": [{"amount_cents": 1}],
+                "extra_info": {"due_dates": [{"due_date": "2026-01-01"}]},
+            }
+        ).data
+        self.assertEqual(
+            data,
+            {
+                "pageItems": [{"amountCents": 1}],
+                "extraInfo": {"dueDates": [{"dueDate": "2026-01-01"}]},
+            },
+        )
+        self.assertEqual(
+            self.PageSerializer._camel_field_map,
+            {"page_items": ("pageItems", True), "extra_info": ("extraInfo", True)},
+        )
+
+    def test_error_details_with_index_keys(self):
+        response = exception_handler(
+            ValidationError({"files": {0: {"file_name": ["This field is required."]}}}), {}
+        )
+        self.assertEqual(
+            response.data["error"]["details"],
+            {"files": {0: {"fileName": ["This field is required."]}}},
+        )
+
+
+class ProjectionTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(
+            email="projection@example.com", password="StrongPass123", name="Projection"
+        )
+        self.borrow_requests = [
+            BorrowRequest.objects.create(
+                requester=self.user,
+                title=f"Borrow {i}",
+                category="medical",
+                reason_detailed="Private",
+                amount_requested_cents=1000 * (i + 1),
+                currency="EUR",
+                expected_return_days=30,
+                status=BorrowRequestStatus.SUBMITTED,
+            )
+            for i in range(3)
+        ]
+        for i, borrow_request in enumerate(self.borrow_requests):
+            Campaign.objects.create(
+                borrow_request=borrow_request,
+                title_public=f"Campaign {i}",
+                story_public="Story",
+                terms_public="Terms",
+                category="medical",
+                amount_needed_cents=10000,
+                amount_pooled_cents=2500 * i,
+                expected_return_days=30,
+                status=CampaignStatus.RUNNING,
+                verified=bool(i % 2),
+            )
+        # A null column is passed through as None, as serializers do.
+        Campaign.objects.filter(title_public="Campaign 0").update(expected_return_date=None)
+
+    def assertSameJSON(self, projection, serializer_class, queryset):
+        expected = JSONRenderer().render(serializer_class(queryset, many=True).data)
+        self.assertEqual(JSONRenderer().render(projection.serialize(queryset)), expected)
+
+    def test_projections_render_like_their_serializers(self):
+        campaigns = Campaign.objects.order_by("-created_at")
+        borrow_requests = BorrowRequest.objects.order_by("-created_at")
+        self.assertSameJSON(CAMPAIGN_CARDS, CampaignCardSerializer, campaigns)
+        self.assertSameJSON(
+            ADMIN_BORROW_REQUEST_LIST, AdminBorrowRequestListSerializer, borrow_requests
+        )
+        self.assertSameJSON(
+            BORROW_REQUEST_SUMMARIES, BorrowRequestSummarySerializer, borrow_requests
+        )
+
+    def test_campaign_list_and_search_match_card_serializer(self):
+        response = self.client.get("/api/v1/campaigns")
+        self.assertEqual(response.status_code, 200)
+        cards = CampaignCardSerializer(
+            Campaign.objects.order_by("-created_at", "-id"), many=True
+        ).data
+        self.assertEqual(
+            JSONRenderer().render(response.data["results"]), JSONRenderer().render(cards)
+        )
+
+        response = self.client.get("/api/v1/campaigns/search", {"q": "campaign", "limit": 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertNotIn("storyPublic", response.data["results"][0])
+        self.assertNotIn("story_public", response.data["results"][0])
@@ -0,0 +1,159 @@
+"""
+Token-bucket throttles.
+
+A view opts in with a `throttle_scope` and `throttle_classes`; each class
+limits one key (client IP, submitted email or user) at the rate configured in
+REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"] under "<scope>_<kind>", for example
+"login_ip": "20/min". A scope with no configured rate is not throttled. Rates
+are read on every request, so settings overrides apply immediately.
+
+Throttles run after authentication but before the handler, so rejected
+requests never reach password hashing or Stripe.
+
+A rate of "20/min" is a bucket of 20 tokens refilled at 20 per minute: short
+bursts up to the bucket size pass, sustained traffic is held to the rate.
+Buckets live in THROTTLE_BUCKET_STORE: the shared Django cache by default, or
+`LocalBucketStore` for a per-process store with no network round trip. The
+Django cache is only shared across workers when CACHE_URL points at Redis or
+memcached; the default local-memory cache is per process.
+
+Client IPs come from DRF's `get_ident`, which trusts X-Forwarded-For only up
+to REST_FRAMEWORK["NUM_PROXIES"] hops.
+"""
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+@functools.cache
+def parse_rate(rate):
+    """'20/min' -> (20, 60): bucket size and the seconds it takes to refill."""
+    num, period = rate.split("/")
+    return int(num), PERIODS[period[0]]
+
+
+def _refill(state, capacity, period, now):
+    tokens, updated = state if state is not None else (capacity, now)
+    return min(capacity, tokens + (now - updated) * capacity / period)
+
+
+def _take(tokens, capacity, period):
+    """Return (tokens left, seconds to wait); the wait is 0 when a token was taken."""
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) * period / capacity
+
+
+class LocalBucketStore:
+    """Per-process buckets: no round trip, but each worker keeps its own limit."""
+
+    max_keys = 100_000
+
+    def __init__(self):
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, period):
+        now = time.monotonic()
+        with self._lock:
+            tokens = _refill(self._buckets.get(key), capacity, period, now)
+            tokens, wait = _take(tokens, capacity, period)
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class CacheBucketStore:
+    """
+    Buckets in the shared Django cache, so the limit holds across workers. The
+    read-modify-write is not atomic: concurrent requests on one key can each
+    take the same token, letting a burst slightly overshoot the bucket.
+    """
+
+    def consume(self, key, capacity, period):
+        now = time.time()
+        tokens = _refill(cache.get(key), capacity, period, now)
+        tokens, wait = _take(tokens, capacity, period)
+        # A bucket left alone for a full period is full again, so it can expire.
+        cache.set(key, (tokens, now), period)
+        return wait
+
+
+@functools.cache
+def get_bucket_store():
+    return import_string(settings.THROTTLE_BUCKET_STORE)()
+
+
+@receiver(setting_changed)
+def _reset_store(*, setting, **kwargs):
+    if setting == "THROTTLE_BUCKET_STORE":
+        get_bucket_store.cache_clear()
+
+
+class TokenBucketThrottle(BaseThrottle):
+    kind = None
+
+    def get_key(self, request):
+        """The identity to limit, or None to let the request through."""
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        self._wait = 0.0
+        scope = getattr(view, "throttle_scope", None)
+        if not scope:
+            return True
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(f"{scope}_{self.kind}")
+        ident = self.get_key(request) if rate else None
+        if ident is None:
+            return True
+        capacity, period = parse_rate(rate)
+        key = f"throttle:{scope}_{self.kind}:{ident}"
+        self._wait = get_bucket_store().consume(key, capacity, period)
+        return self._wait == 0
+
+    def wait(self):
+        return self._wait
+
+
+class IPThrottle(TokenBucketThrottle):
+    kind = "ip"
+
+    def get_key(self, request):
+        return self.get_ident(request)
+
+
+class EmailThrottle(TokenBucketThrottle):
+    """Per submitted email, so one account cannot be guessed at from many IPs."""
+
+    kind = "email"
+
+    def get_key(self, request):
+        email = request.data.get("email") if hasattr(request.data, "get") else None
+        if not isinstance(email, str) or not email.strip():
+            return None
+        return hashlib.sha256(email.strip().lower().encode()).hexdigest()[:32]
+
+
+class UserThrottle(TokenBucketThrottle):
+    """Per authenticated user; anonymous requests fall back to the client IP."""
+
+    kind = "user"
+
+    def get_key(self, request):
+        if request.user and request.user.is_authenticated:
+            return str(request.user.pk)
+        return self.get_ident(request)
@@ -1,9 +1,17 @@
 from django.urls import include, path
 
-from .views import CampaignDetailView, DashboardView, HomeView
+from .views import (
+    CampaignDetailView,
+    CampaignListView,
+    CampaignSearchView,
+    DashboardView,
+    HomeView,
+)
 
 urlpatterns = [
     path("home", HomeView.as_view(), name="home"),
+    path("campaigns", CampaignListView.as_view(), name="campaign-list"),
+    path("campaigns/search", CampaignSearchView.as_view(), name="campaign-search"),
     path("campaigns/<str:campaign_id>", CampaignDetailView.as_view(), name="campaign-detail"),
     path("dashboard", DashboardView.as_view(), name="dashboard"),
     path("", include("accounts.urls")),
@@ -4,7 +4,8 @@ import uuid
 def funding_progress_pct(amount_pooled_cents, amount_needed_cents):
     if not amount_needed_cents or amount_needed_cents <= 0:
         return 0
-    pct = int((amount_pooled_cents / amount_needed_cents) * 100)
+    # Integer math, like Campaign.funding_progress_pct; floats misround 29/100.
+    pct = amount_pooled_cents * 100 // amount_needed_cents
     if pct < 0:
         return 0
     if pct > 100:
@@ -1,10 +1,15 @@
+from django.http import Http404
 from django.shortcuts import get_object_or_404
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
 from drf_spectacular.utils import extend_schema
 from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from campaigns.models import Campaign
+from campaigns.detail_cache import get_cached_payload, get_campaign_version, set_cached_payload
+from campaigns.models import PUBLIC_CAMPAIGN_STATUSES, Campaign, CampaignStatus, PlatformStats
+from campaigns.search import search_campaigns
+from campaigns.serializers import CAMPAIGN_CARDS, CampaignCardSerializer
 from payments.models import Contribution
 from borrow.models import BorrowRequest
 
@@ -13,35 +18,129 @@ from .api_serializers import (
     DashboardResponseSerializer,
     HomeResponseSerializer,
 )
+from core.pagination import KeysetPaginator
+from core.throttling import IPThrottle
 from core.utils import parse_prefixed_uuid
 
+CAMPAIGN_BROWSE_SORTS = {
+    "newest": KeysetPaginator(ordering=("-created_at", "-id"), page_size=20, max_page_size=100),
+    "progress": KeysetPaginator(
+        ordering=("-funding_progress_pct", "-created_at", "-id"), page_size=20, max_page_size=100
+    ),
+}
+
+
+def _campaign_etag(campaign_id, version):
+    return f'"{campaign_id}-{version}"'
+
+
+def _not_modified(request, etag, last_modified):
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        return "*" in etags or etag in etags or f"W/{etag}" in etags
+    if_modified_since = parse_http_date_safe(request.headers.get("If-Modified-Since"))
+    if if_modified_since is not None:
+        return int(last_modified.timestamp()) <= if_modified_since
+    return False
+
+
+def _with_validators(response, campaign_id, version, updated_at):
+    response["ETag"] = _campaign_etag(campaign_id, version)
+    response["Last-Modified"] = http_date(updated_at.timestamp())
+    return response
+
 
 class HomeView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [IPThrottle]
+    throttle_scope = "public"
 
     @extend_schema(responses=HomeResponseSerializer)
     def get(self, request):
         campaigns = Campaign.objects.all()
-        contributions = Contribution.objects.all()
+        stats = PlatformStats.objects.current()
 
         serializer = HomeResponseSerializer(
-            instance={"campaigns": campaigns, "contributions": contributions},
+            instance={"campaigns": campaigns, "stats": stats},
             context={"request": request},
         )
         return Response(serializer.data)
 
 
+class CampaignListView(APIView):
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = [IPThrottle]
+    throttle_scope = "public"
+
+    @extend_schema(responses=CampaignCardSerializer(many=True))
+    def get(self, request):
+        status_param = request.query_params.get("status", CampaignStatus.RUNNING)
+        if status_param not in PUBLIC_CAMPAIGN_STATUSES:
+            return Response({"detail": "Invalid status."}, status=status.HTTP_400_BAD_REQUEST)
+        paginator = CAMPAIGN_BROWSE_SORTS.get(request.query_params.get("sort", "newest"))
+        if paginator is None:
+            return Response({"detail": "Invalid sort."}, status=status.HTTP_400_BAD_REQUEST)
+
+        qs = Campaign.objects.filter(status=status_param)
+        category = request.query_params.get("category")
+        if category:
+            qs = qs.filter(category=category)
+        # The sort columns ride along for the cursor.
+        qs = CAMPAIGN_CARDS.values(qs, "created_at", "funding_progress_pct")
+        rows, next_cursor = paginator.paginate(qs, request)
+        return Response({"results": CAMPAIGN_CARDS.serialize(rows), "nextCursor": next_cursor})
+
+
+class CampaignSearchView(APIView):
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = [IPThrottle]
+    throttle_scope = "public"
+
+    @extend_schema(responses=CampaignCardSerializer(many=True))
+    def get(self, request):
+        statuses = PUBLIC_CAMPAIGN_STATUSES
+        status_param = request.query_params.get("status")
+        if status_param:
+            if status_param not in PUBLIC_CAMPAIGN_STATUSES:
+                return Response({"detail": "Invalid status."}, status=status.HTTP_400_BAD_REQUEST)
+            statuses = [status_param]
+        try:
+            limit = min(max(int(request.query_params.get("limit", 20)), 1), 50)
+        except ValueError:
+            limit = 20
+        campaigns = search_campaigns(
+            request.query_params.get("q", ""), statuses, limit=limit, fields=CAMPAIGN_CARDS.columns
+        )
+        return Response({"results": CAMPAIGN_CARDS.serialize(campaigns)})
+
+
 class CampaignDetailView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [IPThrottle]
+    throttle_scope = "public"
 
     @extend_schema(responses=CampaignDetailResponseSerializer)
     def get(self, request, campaign_id):
         campaign_id = parse_prefixed_uuid("c", campaign_id)
         if campaign_id is None:
             return Response({"detail": "Invalid campaign id."}, status=status.HTTP_400_BAD_REQUEST)
-        campaign = get_object_or_404(Campaign, id=campaign_id)
-        serializer = CampaignDetailResponseSerializer({"campaign": campaign})
-        return Response(serializer.data)
+        current = get_campaign_version(campaign_id)
+        if current is None:
+            raise Http404
+        version, updated_at = current
+        if _not_modified(request, _campaign_etag(campaign_id, version), updated_at):
+            return _with_validators(
+                Response(status=status.HTTP_304_NOT_MODIFIED), campaign_id, version, updated_at
+            )
+
+        payload = get_cached_payload(campaign_id, version)
+        if payload is None:
+            campaign = get_object_or_404(Campaign, id=campaign_id)
+            version, updated_at = campaign.version, campaign.updated_at
+            payload = CampaignDetailResponseSerializer({"campaign": campaign}).data
+            set_cached_payload(campaign_id, version, payload)
+        return _with_validators(Response(payload), campaign_id, version, updated_at)
 
 
 class DashboardView(APIView):
@@ -49,7 +148,7 @@ class DashboardView(APIView):
 
     @extend_schema(responses=DashboardResponseSerializer)
     def get(self, request):
-        contributions = Contribution.objects.filter(contributor=request.user).select_related("campaign")
+        contributions = Contribution.objects.filter(contributor=request.user)
         borrow_requests = BorrowRequest.objects.filter(requester=request.user).order_by("-created_at")
 
         serializer = DashboardResponseSerializer(
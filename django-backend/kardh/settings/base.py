@@ -38,7 +38,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    "core.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
@@ -70,6 +70,10 @@ DATABASES = {
     "default": env.db("DATABASE_URL", default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}"),
 }
 
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
@@ -93,19 +97,49 @@ AUTH_USER_MODEL = "accounts.User"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "EXCEPTION_HANDLER": "core.exception_handler.exception_handler",
+    # "<throttle_scope>_<kind>" for the token-bucket throttles in core/throttling.py.
+    "DEFAULT_THROTTLE_RATES": {
+        "login_ip": "20/min",
+        "login_email": "5/min",
+        "register_ip": "10/hour",
+        "register_email": "5/hour",
+        "checkout_user": "30/min",
+        "public_ip": "300/min",
+    },
+    # Reverse proxies in front of the app. The client IP is taken that many
+    # entries from the right of X-Forwarded-For; 0 ignores the header and uses
+    # REMOTE_ADDR. Left unset, DRF keys IP throttles on the whole
+    # client-supplied header, so each spoofed value would get a fresh bucket.
+    "NUM_PROXIES": env.int("NUM_PROXIES", default=0),
 }
 
+# CacheBucketStore shares buckets through CACHES["default"]. With the default
+# locmemcache:// CACHE_URL that cache is per process, so every worker enforces
+# its own limit; point CACHE_URL at Redis or memcached for a shared limit.
+THROTTLE_BUCKET_STORE = env.str("THROTTLE_BUCKET_STORE", default="core.throttling.CacheBucketStore")
+
 SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
+# The SPA authenticates with Bearer tokens only: API requests get no Django
+# session, and login/logout do not touch django_session.
+AUTH_STATELESS_API = env.bool("AUTH_STATELESS_API", default=True)
+AUTH_STATELESS_API_PREFIX = env.str("AUTH_STATELESS_API_PREFIX", default="/api/")
+
+# Authenticated users are cached per process for a few seconds and in the shared
+# cache for longer; see accounts/authentication.py.
+AUTH_USER_CACHE_TTL = env.int("AUTH_USER_CACHE_TTL", default=300)
+AUTH_USER_LOCAL_CACHE_TTL = env.int("AUTH_USER_LOCAL_CACHE_TTL", default=5)
+AUTH_USER_LOCAL_CACHE_SIZE = env.int("AUTH_USER_LOCAL_CACHE_SIZE", default=10000)
+
 CORS_ALLOWED_ORIGINS = env.list("CORS_ALLOWED_ORIGINS", default=[])
 CORS_ALLOW_CREDENTIALS = env.bool("CORS_ALLOW_CREDENTIALS", default=True)
 CSRF_TRUSTED_ORIGINS = env.list("CSRF_TRUSTED_ORIGINS", default=[])
@@ -120,6 +154,39 @@ AWS_S3_PRESIGNED_EXPIRE = env.int("AWS_S3_PRESIGNED_EXPIRE", default=3600)
 STRIPE_SECRET_KEY = env.str("STRIPE_SECRET_KEY", default="")
 STRIPE_WEBHOOK_SECRET = env.str("STRIPE_WEBHOOK_SECRET", default="")
 STRIPE_PUBLISHABLE_KEY = env.str("STRIPE_PUBLISHABLE_KEY", default="")
+STRIPE_CONNECT_TIMEOUT = env.float("STRIPE_CONNECT_TIMEOUT", default=5.0)
+STRIPE_READ_TIMEOUT = env.float("STRIPE_READ_TIMEOUT", default=20.0)
+STRIPE_MAX_NETWORK_RETRIES = env.int("STRIPE_MAX_NETWORK_RETRIES", default=2)
+STRIPE_HTTP_POOL_SIZE = env.int("STRIPE_HTTP_POOL_SIZE", default=10)
+# Stripe accepts 30 minutes to 24 hours; the value is clamped five minutes
+# inside that window (payments.pledges). Pledges older than it are swept.
+STRIPE_CHECKOUT_SESSION_TTL = env.int("STRIPE_CHECKOUT_SESSION_TTL", default=24 * 3600)
+# "payments.gateway.FakeGateway" swaps Stripe for an in-process fake that
+# accepts unsigned webhooks; it is refused unless DEBUG is on.
+PAYMENTS_GATEWAY = env.str("PAYMENTS_GATEWAY", default="payments.gateway.StripeGateway")
+
+CAMPAIGN_DETAIL_CACHE_TIMEOUT = env.int("CAMPAIGN_DETAIL_CACHE_TIMEOUT", default=300)
+
+# Ledger snapshots trail real time so in-flight transactions are never skipped.
+LEDGER_SNAPSHOT_LAG = env.int("LEDGER_SNAPSHOT_LAG", default=300)
+
+IDEMPOTENCY_KEY_TTL = env.int("IDEMPOTENCY_KEY_TTL", default=24 * 3600)
+# How long an in-progress claim blocks its key before another request may take it.
+IDEMPOTENCY_CLAIM_TTL = env.int("IDEMPOTENCY_CLAIM_TTL", default=300)
+
+# Days after the due date before an unpaid schedule item is marked LATE.
+REPAYMENT_LATE_GRACE_DAYS = env.int("REPAYMENT_LATE_GRACE_DAYS", default=0)
+
+# Default scenario for the staff cash-flow projection; each can be overridden per request.
+CASH_FLOW_LATE_RATE = env.float("CASH_FLOW_LATE_RATE", default=0.1)
+CASH_FLOW_LATE_MONTHS = env.int("CASH_FLOW_LATE_MONTHS", default=1)
+CASH_FLOW_DEFAULT_RATE = env.float("CASH_FLOW_DEFAULT_RATE", default=0.02)
+CASH_FLOW_FUNDING_RATE = env.float("CASH_FLOW_FUNDING_RATE", default=0.8)
+
+WEBHOOK_INBOX_BATCH_SIZE = env.int("WEBHOOK_INBOX_BATCH_SIZE", default=50)
+WEBHOOK_INBOX_MAX_ATTEMPTS = env.int("WEBHOOK_INBOX_MAX_ATTEMPTS", default=8)
+WEBHOOK_INBOX_RETRY_BASE_SECONDS = env.int("WEBHOOK_INBOX_RETRY_BASE_SECONDS", default=30)
+WEBHOOK_INBOX_VISIBILITY_TIMEOUT = env.int("WEBHOOK_INBOX_VISIBILITY_TIMEOUT", default=300)
 
 SPECTACULAR_SETTINGS = {
     "TITLE": "P2P Kardh API",
@@ -0,0 +1,167 @@
+"""
+Payment provider gateway.
+
+Views and webhook handlers go through `get_gateway()` rather than the global
+`stripe` module. The gateway class comes from the PAYMENTS_GATEWAY setting.
+
+StripeGateway keeps a single StripeClient per process. Its requests session
+holds a keep-alive connection pool, timeouts are explicit, and every call is
+timed into a per-operation latency histogram.
+
+FakeGateway runs in-process: it makes no network calls and does not check
+webhook signatures. Point PAYMENTS_GATEWAY at it to load-test checkout,
+repayment and webhook paths locally; `get_gateway()` refuses it unless DEBUG
+is on, since anyone could then post forged payment events.
+"""
+import json
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from functools import cache
+
+import requests
+import stripe
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from requests.adapters import HTTPAdapter
+
+
+class LatencyHistogram:
+    """Thread-safe per-operation latency histogram with fixed millisecond buckets."""
+
+    BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, operation, seconds, error=False):
+        ms = seconds * 1000
+        with self._lock:
+            series = self._series.get(operation)
+            if series is None:
+                series = self._series[operation] = {
+                    "count": 0,
+                    "errors": 0,
+                    "sum_ms": 0.0,
+                    "buckets": [0] * (len(self.BUCKETS_MS) + 1),
+                }
+            series["count"] += 1
+            series["errors"] += int(error)
+            series["sum_ms"] += ms
+            series["buckets"][bisect_left(self.BUCKETS_MS, ms)] += 1
+
+    def snapshot(self):
+        labels = [f"le_{bound}" for bound in self.BUCKETS_MS] + ["le_inf"]
+        with self._lock:
+            return {
+                operation: {
+                    "count": series["count"],
+                    "errors": series["errors"],
+                    "sum_ms": round(series["sum_ms"], 3),
+                    "buckets": dict(zip(labels, series["buckets"])),
+                }
+                for operation, series in self._series.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+latency = LatencyHistogram()
+
+
+class BaseGateway:
+    # Gateways that trust unsigned webhooks may only run with DEBUG on.
+    requires_debug = False
+
+    @contextmanager
+    def timed(self, operation):
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            latency.observe(operation, time.perf_counter() - started, error=True)
+            raise
+        latency.observe(operation, time.perf_counter() - started)
+
+    def create_checkout_session(self, params, idempotency_key=None):
+        raise NotImplementedError
+
+    def construct_event(self, payload, sig_header):
+        raise NotImplementedError
+
+
+class StripeGateway(BaseGateway):
+    def __init__(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=settings.STRIPE_HTTP_POOL_SIZE,
+            pool_maxsize=settings.STRIPE_HTTP_POOL_SIZE,
+        )
+        session.mount("https://", adapter)
+        http_client = stripe.RequestsClient(
+            session=session,
+            timeout=(settings.STRIPE_CONNECT_TIMEOUT, settings.STRIPE_READ_TIMEOUT),
+        )
+        self.client = stripe.StripeClient(
+            settings.STRIPE_SECRET_KEY or "sk_unset",
+            http_client=http_client,
+            max_network_retries=settings.STRIPE_MAX_NETWORK_RETRIES,
+        )
+        self.webhook_secret = settings.STRIPE_WEBHOOK_SECRET
+
+    def create_checkout_session(self, params, idempotency_key=None):
+        options = {"idempotency_key": idempotency_key} if idempotency_key else {}
+        with self.timed("checkout.sessions.create"):
+            return self.client.checkout.sessions.create(params=params, options=options)
+
+    def construct_event(self, payload, sig_header):
+        with self.timed("webhook.construct_event"):
+            return self.client.construct_event(payload, sig_header, self.webhook_secret)
+
+
+class FakeGateway(BaseGateway):
+    checkout_url = "https://checkout.fake.invalid/pay"
+    requires_debug = True
+    # Only the latest sessions are kept for inspection, so load tests stay flat.
+    max_sessions = 1000
+
+    def __init__(self):
+        self.sessions = deque(maxlen=self.max_sessions)
+
+    def create_checkout_session(self, params, idempotency_key=None):
+        with self.timed("checkout.sessions.create"):
+            session_id = f"cs_fake_{uuid.uuid4().hex}"
+            session = stripe.checkout.Session.construct_from(
+                {"id": session_id, "url": f"{self.checkout_url}/{session_id}", **params}, "sk_fake"
+            )
+            self.sessions.append(session)
+            return session
+
+    def construct_event(self, payload, sig_header):
+        with self.timed("webhook.construct_event"):
+            return json.loads(payload)
+
+
+@cache
+def get_gateway():
+    gateway_class = import_string(settings.PAYMENTS_GATEWAY)
+    if gateway_class.requires_debug and not settings.DEBUG:
+        raise ImproperlyConfigured(
+            f"{settings.PAYMENTS_GATEWAY} does not verify webhooks and needs DEBUG on."
+        )
+    return gateway_class()
+
+
+@receiver(setting_changed)
+def _reset_gateway(*, setting, **kwargs):
+    if setting in ("PAYMENTS_GATEWAY", "DEBUG") or setting.startswith("STRIPE_"):
+        get_gateway.cache_clear()
@@ -0,0 +1,129 @@
+"""
+Durable inbox for Stripe webhook events.
+
+The webhook view only verifies the signature and calls `record_event`, so Stripe
+gets its 200 without waiting on campaign or borrow request row locks. The
+`process_webhooks` worker drains the inbox in batches: each event is passed to
+`payments.webhooks.dispatch` inside one transaction, retried with
+exponential backoff on failure, and dead-lettered after
+WEBHOOK_INBOX_MAX_ATTEMPTS.
+"""
+import hashlib
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Min
+from django.utils import timezone
+
+from .models import WebhookEvent, WebhookEventStatus
+from .webhooks import dispatch
+
+logger = logging.getLogger(__name__)
+
+CLAIMABLE_STATUSES = (
+    WebhookEventStatus.PENDING,
+    WebhookEventStatus.FAILED,
+    # A claim whose visibility timeout ran out belongs to a worker that died.
+    WebhookEventStatus.PROCESSING,
+)
+
+
+def record_event(event, raw_payload):
+    """Store a verified event once; Stripe redeliveries of the same id are ignored."""
+    event_id = event.get("id") or hashlib.sha256(raw_payload).hexdigest()
+    try:
+        with transaction.atomic():
+            WebhookEvent.objects.create(
+                event_id=event_id, type=event.get("type", ""), payload=event
+            )
+    except IntegrityError:
+        return False
+    return True
+
+
+def claim_batch(batch_size):
+    now = timezone.now()
+    lease_until = now + timedelta(seconds=settings.WEBHOOK_INBOX_VISIBILITY_TIMEOUT)
+    with transaction.atomic():
+        ids = list(
+            WebhookEvent.objects.select_for_update(skip_locked=True)
+            .filter(status__in=CLAIMABLE_STATUSES, available_at__lte=now)
+            .order_by("available_at")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        WebhookEvent.objects.filter(id__in=ids).update(
+            status=WebhookEventStatus.PROCESSING,
+            attempts=F("attempts") + 1,
+            available_at=lease_until,
+        )
+    return list(WebhookEvent.objects.filter(id__in=ids).order_by("received_at"))
+
+
+def retry_delay(attempts):
+    base = settings.WEBHOOK_INBOX_RETRY_BASE_SECONDS
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), 6 * 3600))
+
+
+def process_event(webhook_event):
+    """Run every handler for one claimed event. Returns the final status."""
+    try:
+        with transaction.atomic():
+            dispatch(webhook_event.payload)
+            webhook_event.status = WebhookEventStatus.DONE
+            webhook_event.processed_at = timezone.now()
+            webhook_event.last_error = ""
+            webhook_event.save(update_fields=["status", "processed_at", "last_error"])
+    except Exception as exc:
+        logger.exception("Webhook event %s failed", webhook_event.event_id)
+        webhook_event.last_error = repr(exc)
+        if webhook_event.attempts >= settings.WEBHOOK_INBOX_MAX_ATTEMPTS:
+            webhook_event.status = WebhookEventStatus.DEAD
+        else:
+            webhook_event.status = WebhookEventStatus.FAILED
+            webhook_event.available_at = timezone.now() + retry_delay(webhook_event.attempts)
+        webhook_event.save(update_fields=["status", "last_error", "available_at"])
+    return webhook_event.status
+
+
+def drain(batch_size=None, max_batches=None):
+    """Process claimable events until the inbox is empty or `max_batches` is hit."""
+    batch_size = batch_size or settings.WEBHOOK_INBOX_BATCH_SIZE
+    stats = {"processed": 0, "failed": 0, "dead": 0, "max_lag_seconds": 0.0}
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        events = claim_batch(batch_size)
+        if not events:
+            break
+        batches += 1
+        for webhook_event in events:
+            result = process_event(webhook_event)
+            if result == WebhookEventStatus.DONE:
+                stats["processed"] += 1
+                lag = (webhook_event.processed_at - webhook_event.received_at).total_seconds()
+                stats["max_lag_seconds"] = max(stats["max_lag_seconds"], lag)
+            elif result == WebhookEventStatus.DEAD:
+                stats["dead"] += 1
+            else:
+                stats["failed"] += 1
+    return stats
+
+
+def backlog():
+    """Depth and age of the oldest waiting event, for lag alerting."""
+    waiting = WebhookEvent.objects.filter(
+        status__in=[WebhookEventStatus.PENDING, WebhookEventStatus.FAILED]
+    )
+    oldest = waiting.aggregate(oldest=Min("received_at"))["oldest"]
+    return {
+        "pending": waiting.count(),
+        "dead": WebhookEvent.objects.filter(status=WebhookEventStatus.DEAD).count(),
+        "oldest_age_seconds": (timezone.now() - oldest).total_seconds() if oldest else 0.0,
+    }
+
+
+def requeue_dead():
+    return WebhookEvent.objects.filter(status=WebhookEventStatus.DEAD).update(
+        status=WebhookEventStatus.PENDING, attempts=0, available_at=timezone.now()
+    )
@@ -0,0 +1,190 @@
+"""
+Double-entry platform ledger.
+
+Every money movement is posted as one transaction: a set of PlatformLedger rows
+that share a `transaction_id` and whose debits equal their credits. Balances
+are debit-normal (debits minus credits).
+
+`snapshot_balances` periodically records each account's balance as of a point
+slightly in the past; `balance` reads the latest snapshot and adds only the
+entries created after it, so its cost depends on the snapshot interval rather
+than on the size of the ledger.
+"""
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Sum, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import (
+    LedgerAccount,
+    LedgerBalanceSnapshot,
+    LedgerDirection,
+    PlatformLedger,
+    PlatformLedgerType,
+)
+
+DEBIT = LedgerDirection.DEBIT
+CREDIT = LedgerDirection.CREDIT
+
+_signed_amount = Case(
+    When(direction=DEBIT, then=F("amount_cents")),
+    default=-F("amount_cents"),
+)
+
+
+class UnbalancedTransaction(ValueError):
+    pass
+
+
+def post(entry_type, lines, currency, **related):
+    """
+    Write one balanced transaction. `lines` are (account, direction, amount_cents)
+    tuples; `related` holds the related_* foreign keys shared by every line.
+    """
+    debits = sum(amount for _, direction, amount in lines if direction == DEBIT)
+    credits = sum(amount for _, direction, amount in lines if direction == CREDIT)
+    if debits != credits:
+        raise UnbalancedTransaction(f"{entry_type}: debits {debits} != credits {credits}")
+    transaction_id = uuid.uuid4()
+    PlatformLedger.objects.bulk_create(
+        PlatformLedger(
+            transaction_id=transaction_id,
+            type=entry_type,
+            account=account,
+            direction=direction,
+            amount_cents=amount,
+            currency=currency,
+            **related,
+        )
+        for account, direction, amount in lines
+        if amount
+    )
+    return transaction_id
+
+
+def record_contribution(contribution_id, campaign_id, amount_cents, currency):
+    """Contributor money lands in cash and is held for the campaign."""
+    return post(
+        PlatformLedgerType.CONTRIBUTION,
+        [
+            (LedgerAccount.CASH, DEBIT, amount_cents),
+            (LedgerAccount.CAMPAIGN_ESCROW, CREDIT, amount_cents),
+        ],
+        currency,
+        related_contribution_id=contribution_id,
+        related_campaign_id=campaign_id,
+    )
+
+
+def record_disbursement(borrow_request_id, campaign_id, amount_cents, currency):
+    """
+    Escrow is paid out to the borrower: the borrower now owes the platform and
+    the platform owes the contributors.
+    """
+    return post(
+        PlatformLedgerType.DISBURSEMENT,
+        [
+            (LedgerAccount.BORROWER_RECEIVABLE, DEBIT, amount_cents),
+            (LedgerAccount.CASH, CREDIT, amount_cents),
+            (LedgerAccount.CAMPAIGN_ESCROW, DEBIT, amount_cents),
+            (LedgerAccount.CONTRIBUTOR_PAYABLE, CREDIT, amount_cents),
+        ],
+        currency,
+        related_borrow_request_id=borrow_request_id,
+        related_campaign_id=campaign_id,
+    )
+
+
+def record_repayment(repayment_payment_id, borrow_request_id, amount_cents, currency):
+    return post(
+        PlatformLedgerType.REPAYMENT,
+        [
+            (LedgerAccount.CASH, DEBIT, amount_cents),
+            (LedgerAccount.BORROWER_RECEIVABLE, CREDIT, amount_cents),
+        ],
+        currency,
+        related_repayment_payment_id=repayment_payment_id,
+        related_borrow_request_id=borrow_request_id,
+    )
+
+
+def record_return(contribution_id, campaign_id, amount_cents, currency):
+    return post(
+        PlatformLedgerType.RETURN,
+        [
+            (LedgerAccount.CONTRIBUTOR_PAYABLE, DEBIT, amount_cents),
+            (LedgerAccount.CASH, CREDIT, amount_cents),
+        ],
+        currency,
+        related_contribution_id=contribution_id,
+        related_campaign_id=campaign_id,
+    )
+
+
+def record_default_cover(borrow_request_id, amount_cents, currency):
+    """Write off an unrecoverable receivable against the platform's default loss."""
+    return post(
+        PlatformLedgerType.DEFAULT_COVER,
+        [
+            (LedgerAccount.DEFAULT_LOSS, DEBIT, amount_cents),
+            (LedgerAccount.BORROWER_RECEIVABLE, CREDIT, amount_cents),
+        ],
+        currency,
+        related_borrow_request_id=borrow_request_id,
+    )
+
+
+def _sum_entries(account, after=None, until=None):
+    entries = PlatformLedger.objects.filter(account=account)
+    if after is not None:
+        entries = entries.filter(created_at__gt=after)
+    if until is not None:
+        entries = entries.filter(created_at__lte=until)
+    return entries.aggregate(total=Coalesce(Sum(_signed_amount), 0))["total"]
+
+
+def _latest_snapshot(account, before=None):
+    snapshots = LedgerBalanceSnapshot.objects.filter(account=account)
+    if before is not None:
+        snapshots = snapshots.filter(as_of__lte=before)
+    return snapshots.order_by("-as_of").first()
+
+
+def balance(account):
+    snapshot = _latest_snapshot(account)
+    if snapshot is None:
+        return _sum_entries(account)
+    return snapshot.balance_cents + _sum_entries(account, after=snapshot.as_of)
+
+
+def balances():
+    return {account: balance(account) for account in LedgerAccount.values}
+
+
+def snapshot_balances(as_of=None):
+    """
+    Record every account's balance as of `as_of`, which defaults to
+    LEDGER_SNAPSHOT_LAG seconds ago so that transactions still in flight (and
+    so not yet visible) cannot be created before a snapshot that misses them.
+    Each snapshot is built from the previous one, not from the whole ledger.
+    """
+    if as_of is None:
+        as_of = timezone.now() - timedelta(seconds=settings.LEDGER_SNAPSHOT_LAG)
+    created = []
+    with transaction.atomic():
+        for account in LedgerAccount.values:
+            previous = _latest_snapshot(account, before=as_of)
+            if previous is not None and previous.as_of == as_of:
+                continue
+            base = previous.balance_cents if previous else 0
+            delta = _sum_entries(account, after=previous.as_of if previous else None, until=as_of)
+            created.append(
+                LedgerBalanceSnapshot.objects.create(
+                    account=account, as_of=as_of, balance_cents=base + delta
+                )
+            )
+    return created
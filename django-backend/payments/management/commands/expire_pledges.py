@@ -0,0 +1,23 @@
+from django.core.management import BaseCommand
+
+from payments.pledges import expire_stale_pledges
+
+
+class Command(BaseCommand):
+    help = "Expire PLEDGED contributions whose Stripe checkout session has lapsed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument(
+            "--ttl", type=int, default=None, help="Age in seconds; defaults to the session TTL."
+        )
+
+    def handle(self, *args, **options):
+        stats = expire_stale_pledges(ttl_seconds=options["ttl"], chunk_size=options["chunk_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Expired {stats['expired']} pledges in {stats['chunks']} chunks, "
+                f"released {stats['released_cents']} cents; "
+                f"{stats['seconds']:.2f}s ({stats['per_second']:.0f} rows/s)."
+            )
+        )
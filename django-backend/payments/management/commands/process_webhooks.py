@@ -0,0 +1,41 @@
+import time
+
+from django.core.management import BaseCommand
+
+from payments import inbox
+
+
+class Command(BaseCommand):
+    help = "Drain the Stripe webhook inbox, retrying failures and dead-lettering poison events."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--once", action="store_true", help="Exit once the inbox is empty.")
+        parser.add_argument("--sleep", type=float, default=2.0, help="Idle poll interval.")
+        parser.add_argument(
+            "--requeue-dead", action="store_true", help="Move dead events back to pending first."
+        )
+
+    def handle(self, *args, **options):
+        if options["requeue_dead"]:
+            requeued = inbox.requeue_dead()
+            self.stdout.write(f"Requeued {requeued} dead events.")
+
+        while True:
+            stats = inbox.drain(batch_size=options["batch_size"])
+            if stats["processed"] or stats["failed"] or stats["dead"]:
+                self.report(stats)
+            if options["once"]:
+                break
+            time.sleep(options["sleep"])
+
+    def report(self, stats):
+        backlog = inbox.backlog()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Processed {stats['processed']}, failed {stats['failed']}, "
+                f"dead {stats['dead']}; max lag {stats['max_lag_seconds']:.1f}s; "
+                f"backlog {backlog['pending']} (oldest {backlog['oldest_age_seconds']:.1f}s), "
+                f"dead letters {backlog['dead']}."
+            )
+        )
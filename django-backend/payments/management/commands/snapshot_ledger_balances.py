@@ -0,0 +1,13 @@
+from django.core.management import BaseCommand
+
+from payments.ledger import snapshot_balances
+
+
+class Command(BaseCommand):
+    help = "Record a balance snapshot for every ledger account."
+
+    def handle(self, *args, **options):
+        snapshots = snapshot_balances()
+        for snapshot in snapshots:
+            self.stdout.write(f"{snapshot.account}: {snapshot.balance_cents}")
+        self.stdout.write(self.style.SUCCESS(f"Recorded {len(snapshots)} ledger snapshots."))
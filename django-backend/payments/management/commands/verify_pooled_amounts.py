@@ -0,0 +1,68 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.db.models.functions import Coalesce
+
+from campaigns.models import Campaign
+from payments.models import POOLED_CONTRIBUTION_STATUSES, Contribution
+
+
+def _true_pooled(queryset):
+    return queryset.annotate(
+        true_pooled=Coalesce(
+            Sum(
+                "contributions__amount_cents",
+                filter=Q(contributions__status__in=POOLED_CONTRIBUTION_STATUSES),
+            ),
+            0,
+        )
+    )
+
+
+class Command(BaseCommand):
+    help = "Check campaign pooled amounts against their contributions and repair drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repair", action="store_true", help="Correct drifted campaigns.")
+
+    def handle(self, *args, **options):
+        drifted = list(
+            _true_pooled(Campaign.objects.all())
+            .exclude(amount_pooled_cents=F("true_pooled"))
+            .values_list("id", "amount_pooled_cents", "true_pooled")
+        )
+        for campaign_id, pooled, true_pooled in drifted:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Campaign {campaign_id}: pooled {pooled}, contributions {true_pooled}."
+                )
+            )
+        if not options["repair"]:
+            self.stdout.write(self.style.SUCCESS(f"{len(drifted)} campaigns drifted."))
+            return
+
+        repaired = 0
+        for campaign_id, _, _ in drifted:
+            with transaction.atomic():
+                # Re-read under the row lock so a payment landing meanwhile is not undone.
+                pooled = (
+                    Campaign.objects.select_for_update()
+                    .values_list("amount_pooled_cents", flat=True)
+                    .get(id=campaign_id)
+                )
+                true_pooled = (
+                    Contribution.objects.filter(
+                        campaign_id=campaign_id, status__in=POOLED_CONTRIBUTION_STATUSES
+                    ).aggregate(total=Sum("amount_cents"))["total"]
+                    or 0
+                )
+                if pooled != true_pooled:
+                    delta = true_pooled - pooled
+                    Campaign.objects.add_pooled(campaign_id, delta)
+                    # The reservation counter includes the pool; keep it in step.
+                    if delta > 0:
+                        Campaign.objects.force_reserve(campaign_id, delta)
+                    else:
+                        Campaign.objects.release(campaign_id, -delta)
+                    repaired += 1
+        self.stdout.write(self.style.SUCCESS(f"Repaired {repaired} campaigns."))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0002_webhookevent'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='contribution',
+            name='status',
+            field=models.CharField(choices=[('PLEDGED', 'Pledged'), ('PAID', 'Paid'), ('RETURNED', 'Returned'), ('DEFAULT_COVERED', 'Default covered'), ('EXPIRED', 'Expired'), ('CANCELLED', 'Cancelled')], default='PLEDGED', max_length=20),
+        ),
+    ]
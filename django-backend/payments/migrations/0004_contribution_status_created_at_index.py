@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0006_campaign_reserved_cents'),
+        ('payments', '0003_contribution_expired_cancelled'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contribution',
+            index=models.Index(fields=['status', 'created_at'], name='payments_co_status_dbc171_idx'),
+        ),
+    ]
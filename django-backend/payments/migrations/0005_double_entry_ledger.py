@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:22
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('borrow', '0002_borrowrequest_queue_indexes'),
+        ('campaigns', '0006_campaign_reserved_cents'),
+        ('payments', '0004_contribution_status_created_at_index'),
+        ('repayments', '0003_repaymentsetup_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerBalanceSnapshot',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('account', models.CharField(choices=[('CASH', 'Cash'), ('CAMPAIGN_ESCROW', 'Campaign escrow'), ('BORROWER_RECEIVABLE', 'Borrower receivable'), ('CONTRIBUTOR_PAYABLE', 'Contributor payable'), ('DEFAULT_LOSS', 'Default loss')], max_length=30)),
+                ('as_of', models.DateTimeField()),
+                ('balance_cents', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='platformledger',
+            name='account',
+            field=models.CharField(choices=[('CASH', 'Cash'), ('CAMPAIGN_ESCROW', 'Campaign escrow'), ('BORROWER_RECEIVABLE', 'Borrower receivable'), ('CONTRIBUTOR_PAYABLE', 'Contributor payable'), ('DEFAULT_LOSS', 'Default loss')], default='CASH', max_length=30),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='platformledger',
+            name='direction',
+            field=models.CharField(choices=[('DEBIT', 'Debit'), ('CREDIT', 'Credit')], default='DEBIT', max_length=6),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='platformledger',
+            name='related_repayment_payment',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ledger_entries', to='repayments.repaymentpayment'),
+        ),
+        migrations.AddField(
+            model_name='platformledger',
+            name='transaction_id',
+            field=models.UUIDField(db_index=True, default=uuid.uuid4),
+        ),
+        migrations.AlterField(
+            model_name='platformledger',
+            name='type',
+            field=models.CharField(choices=[('CONTRIBUTION', 'Contribution'), ('DISBURSEMENT', 'Disbursement'), ('REPAYMENT', 'Repayment'), ('DEFAULT_COVER', 'Default cover'), ('RETURN', 'Return')], max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='platformledger',
+            index=models.Index(fields=['account', 'created_at'], name='payments_pl_account_e12b53_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='ledgerbalancesnapshot',
+            constraint=models.UniqueConstraint(fields=('account', 'as_of'), name='uniq_ledger_snapshot'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0005_double_entry_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contribution',
+            name='amount_returned_cents',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -3,6 +3,7 @@ import uuid
 from django.conf import settings
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.utils import timezone
 
 from borrow.models import BorrowRequest, Currency
 from campaigns.models import Campaign
@@ -13,6 +14,16 @@ class ContributionStatus(models.TextChoices):
     PAID = "PAID", "Paid"
     RETURNED = "RETURNED", "Returned"
     DEFAULT_COVERED = "DEFAULT_COVERED", "Default covered"
+    EXPIRED = "EXPIRED", "Expired"
+    CANCELLED = "CANCELLED", "Cancelled"
+
+
+# Contributions whose money has reached the campaign pool.
+POOLED_CONTRIBUTION_STATUSES = (
+    ContributionStatus.PAID,
+    ContributionStatus.RETURNED,
+    ContributionStatus.DEFAULT_COVERED,
+)
 
 
 class PaymentProvider(models.TextChoices):
@@ -20,11 +31,34 @@ class PaymentProvider(models.TextChoices):
 
 
 class PlatformLedgerType(models.TextChoices):
+    CONTRIBUTION = "CONTRIBUTION", "Contribution"
     DISBURSEMENT = "DISBURSEMENT", "Disbursement"
+    REPAYMENT = "REPAYMENT", "Repayment"
     DEFAULT_COVER = "DEFAULT_COVER", "Default cover"
     RETURN = "RETURN", "Return"
 
 
+class LedgerAccount(models.TextChoices):
+    CASH = "CASH", "Cash"
+    CAMPAIGN_ESCROW = "CAMPAIGN_ESCROW", "Campaign escrow"
+    BORROWER_RECEIVABLE = "BORROWER_RECEIVABLE", "Borrower receivable"
+    CONTRIBUTOR_PAYABLE = "CONTRIBUTOR_PAYABLE", "Contributor payable"
+    DEFAULT_LOSS = "DEFAULT_LOSS", "Default loss"
+
+
+class LedgerDirection(models.TextChoices):
+    DEBIT = "DEBIT", "Debit"
+    CREDIT = "CREDIT", "Credit"
+
+
+class WebhookEventStatus(models.TextChoices):
+    PENDING = "PENDING", "Pending"
+    PROCESSING = "PROCESSING", "Processing"
+    DONE = "DONE", "Done"
+    FAILED = "FAILED", "Failed"
+    DEAD = "DEAD", "Dead"
+
+
 class Contribution(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     contributor = models.ForeignKey(
@@ -41,14 +75,23 @@ class Contribution(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     paid_at = models.DateTimeField(null=True, blank=True)
     returned_at = models.DateTimeField(null=True, blank=True)
+    amount_returned_cents = models.PositiveBigIntegerField(default=0)
 
     class Meta:
-        indexes = [models.Index(fields=["status"])]
+        indexes = [
+            models.Index(fields=["status"]),
+            models.Index(fields=["status", "created_at"]),
+        ]
 
 
 class PlatformLedger(models.Model):
+    """One side of a balanced ledger transaction; see payments.ledger."""
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    transaction_id = models.UUIDField(default=uuid.uuid4, db_index=True)
     type = models.CharField(max_length=20, choices=PlatformLedgerType.choices)
+    account = models.CharField(max_length=30, choices=LedgerAccount.choices)
+    direction = models.CharField(max_length=6, choices=LedgerDirection.choices)
     amount_cents = models.PositiveBigIntegerField(validators=[MinValueValidator(0)])
     currency = models.CharField(max_length=3, choices=Currency.choices, default=Currency.EUR)
     related_campaign = models.ForeignKey(
@@ -68,7 +111,50 @@ class PlatformLedger(models.Model):
         on_delete=models.SET_NULL,
         related_name="ledger_entries",
     )
+    related_repayment_payment = models.ForeignKey(
+        "repayments.RepaymentPayment",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="ledger_entries",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        indexes = [models.Index(fields=["type"])]
+        indexes = [
+            models.Index(fields=["type"]),
+            models.Index(fields=["account", "created_at"]),
+        ]
+
+
+class LedgerBalanceSnapshot(models.Model):
+    """Balance of one account over every entry created at or before `as_of`."""
+
+    id = models.BigAutoField(primary_key=True)
+    account = models.CharField(max_length=30, choices=LedgerAccount.choices)
+    as_of = models.DateTimeField()
+    balance_cents = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["account", "as_of"], name="uniq_ledger_snapshot")
+        ]
+
+
+class WebhookEvent(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    event_id = models.CharField(max_length=255, unique=True)
+    type = models.CharField(max_length=100)
+    payload = models.JSONField()
+    status = models.CharField(
+        max_length=20, choices=WebhookEventStatus.choices, default=WebhookEventStatus.PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "available_at"])]
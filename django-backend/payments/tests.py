@@ -1,11 +1,37 @@
+import json
+import time
+from datetime import timedelta
+from io import StringIO
 from types import SimpleNamespace
 from unittest.mock import patch
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from django.utils import timezone
 from rest_framework.test import APITestCase
 
-from campaigns.models import Campaign, CampaignStatus
-from payments.models import Contribution, ContributionStatus, PaymentProvider
+from borrow.models import BorrowRequest, BorrowRequestStatus
+from campaigns.models import Campaign, CampaignStatus, PlatformStats
+from core.models import IdempotencyKey
+from payments import inbox, ledger
+from payments.gateway import get_gateway, latency
+from payments.models import (
+    Contribution,
+    ContributionStatus,
+    LedgerAccount,
+    LedgerBalanceSnapshot,
+    PaymentProvider,
+    PlatformLedger,
+    WebhookEvent,
+    WebhookEventStatus,
+)
+from payments.pledges import checkout_session_ttl
+from payments.webhooks import dispatch, register, session_type
+from repayments.models import RepaymentPayment
 
 
 class SupportCheckoutTests(APITestCase):
@@ -26,7 +52,7 @@ class SupportCheckoutTests(APITestCase):
             verified=True,
         )
 
-    @patch("payments.views.stripe.checkout.Session.create")
+    @patch("payments.gateway.StripeGateway.create_checkout_session")
     def test_support_checkout_creates_contribution_and_returns_checkout(self, mock_create):
         mock_create.return_value = SimpleNamespace(id="cs_test_123", url="https://stripe.test/checkout")
         self.client.force_authenticate(user=self.user)
@@ -67,7 +93,7 @@ class SupportCheckoutTests(APITestCase):
 
 
 class StripeWebhookTests(APITestCase):
-    @patch("payments.views.stripe.Webhook.construct_event")
+    @patch("payments.gateway.StripeGateway.construct_event")
     def test_webhook_marks_paid_and_updates_campaign(self, mock_construct_event):
         User = get_user_model()
         user = User.objects.create_user(
@@ -115,7 +141,10 @@ class StripeWebhookTests(APITestCase):
             HTTP_STRIPE_SIGNATURE="sig",
         )
         self.assertEqual(response.status_code, 200)
+        contribution.refresh_from_db()
+        self.assertEqual(contribution.status, ContributionStatus.PLEDGED)
 
+        call_command("process_webhooks", once=True, stdout=StringIO())
         contribution.refresh_from_db()
         campaign.refresh_from_db()
         self.assertEqual(contribution.status, ContributionStatus.PAID)
@@ -130,5 +159,689 @@ class StripeWebhookTests(APITestCase):
             HTTP_STRIPE_SIGNATURE="sig",
         )
         self.assertEqual(response_repeat.status_code, 200)
+        self.assertEqual(WebhookEvent.objects.count(), 1)
+        call_command("process_webhooks", once=True, stdout=StringIO())
         campaign.refresh_from_db()
         self.assertEqual(campaign.amount_pooled_cents, 10000)
+
+
+@override_settings(WEBHOOK_INBOX_MAX_ATTEMPTS=2)
+class WebhookInboxTests(TestCase):
+    def _record(self, event_id, event_type="checkout.session.completed"):
+        event = {"id": event_id, "type": event_type, "data": {"object": {"metadata": {}}}}
+        return inbox.record_event(event, b"{}")
+
+    def test_record_event_dedupes_on_event_id(self):
+        self.assertTrue(self._record("evt_1"))
+        self.assertFalse(self._record("evt_1"))
+        event = WebhookEvent.objects.get()
+        self.assertEqual(event.status, WebhookEventStatus.PENDING)
+        self.assertEqual(event.type, "checkout.session.completed")
+
+    def test_drain_marks_done_and_reports_lag(self):
+        self._record("evt_1")
+        self._record("evt_2", event_type="payment_intent.created")
+        stats = inbox.drain(batch_size=1)
+        self.assertEqual(stats["processed"], 2)
+        self.assertGreaterEqual(stats["max_lag_seconds"], 0)
+        self.assertFalse(
+            WebhookEvent.objects.exclude(status=WebhookEventStatus.DONE).exists()
+        )
+        self.assertEqual(inbox.backlog()["pending"], 0)
+
+    def test_failures_back_off_then_dead_letter(self):
+        self._record("evt_bad")
+        handler = "payments.inbox.dispatch"
+        with patch(handler, side_effect=RuntimeError("boom")):
+            stats = inbox.drain()
+            self.assertEqual(stats["failed"], 1)
+            event = WebhookEvent.objects.get()
+            self.assertEqual(event.status, WebhookEventStatus.FAILED)
+            self.assertEqual(event.attempts, 1)
+            self.assertIn("boom", event.last_error)
+            self.assertGreater(event.available_at, timezone.now())
+
+            self.assertEqual(inbox.drain()["failed"], 0)
+
+            WebhookEvent.objects.update(available_at=timezone.now() - timedelta(seconds=1))
+            self.assertEqual(inbox.drain()["dead"], 1)
+        event.refresh_from_db()
+        self.assertEqual(event.status, WebhookEventStatus.DEAD)
+
+        out = StringIO()
+        call_command("process_webhooks", once=True, requeue_dead=True, stdout=out)
+        self.assertIn("Requeued 1 dead events.", out.getvalue())
+        event.refresh_from_db()
+        self.assertEqual(event.status, WebhookEventStatus.DONE)
+
+    def test_expired_processing_claim_is_reclaimed(self):
+        self._record("evt_1")
+        WebhookEvent.objects.update(
+            status=WebhookEventStatus.PROCESSING,
+            available_at=timezone.now() - timedelta(seconds=1),
+        )
+        self.assertEqual(inbox.drain()["processed"], 1)
+
+
+class PooledAmountTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(
+            email="pool@example.com", password="StrongPass123", name="Pool"
+        )
+        self.campaign = Campaign.objects.create(
+            title_public="Campaign",
+            story_public="Story",
+            terms_public="Terms",
+            category="medical",
+            amount_needed_cents=10000,
+            expected_return_days=30,
+            status=CampaignStatus.RUNNING,
+            verified=True,
+        )
+
+    def _contribution(self, amount_cents, status=ContributionStatus.PLEDGED):
+        return Contribution.objects.create(
+            contributor=self.user,
+            campaign=self.campaign,
+            amount_cents=amount_cents,
+            status=status,
+            provider=PaymentProvider.STRIPE,
+            provider_session_id=f"cs_{Contribution.objects.count()}",
+        )
+
+    def _pay(self, contribution):
+        inbox.record_event(
+            {
+                "id": f"evt_{contribution.id}",
+                "type": "checkout.session.completed",
+                "data": {"object": {"metadata": {"contribution_id": str(contribution.id)}}},
+            },
+            b"{}",
+        )
+        inbox.drain()
+
+    def test_payments_increment_pool_and_fund_campaign(self):
+        first = self._contribution(4000)
+        second = self._contribution(6000)
+        version = self.campaign.version
+
+        self._pay(first)
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.amount_pooled_cents, 4000)
+        self.assertEqual(self.campaign.status, CampaignStatus.RUNNING)
+        self.assertGreater(self.campaign.version, version)
+
+        self._pay(second)
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.amount_pooled_cents, 10000)
+        self.assertEqual(self.campaign.status, CampaignStatus.FUNDED)
+
+        stats = PlatformStats.objects.current()
+        self.assertEqual(stats.total_pooled_cents, 10000)
+        self.assertEqual(stats.active_campaign_count, 0)
+
+    def test_payment_does_not_reaggregate_contributions(self):
+        for _ in range(20):
+            self._contribution(100, status=ContributionStatus.PAID)
+        contribution = self._contribution(500)
+        with patch("django.db.models.query.QuerySet.aggregate") as aggregate:
+            self._pay(contribution)
+        aggregate.assert_not_called()
+
+    def test_verifier_reports_and_repairs_drift(self):
+        self._contribution(3000, status=ContributionStatus.PAID)
+        self._contribution(2000, status=ContributionStatus.RETURNED)
+        self._contribution(9000)
+
+        out = StringIO()
+        call_command("verify_pooled_amounts", stdout=out)
+        self.assertIn("1 campaigns drifted.", out.getvalue())
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.amount_pooled_cents, 0)
+
+        call_command("verify_pooled_amounts", repair=True, stdout=out)
+        self.assertIn("Repaired 1 campaigns.", out.getvalue())
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.amount_pooled_cents, 5000)
+        self.assertEqual(self.campaign.reserved_cents, 5000)
+        self.assertEqual(PlatformStats.objects.current().total_pooled_cents, 5000)
+
+        out = StringIO()
+        call_command("verify_pooled_amounts", stdout=out)
+        self.assertIn("0 campaigns drifted.", out.getvalue())
+
+
+class IdempotentCheckoutTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(
+            email="retry@example.com", password="StrongPass123", name="Retry"
+        )
+        self.campaign = Campaign.objects.create(
+            title_public="Campaign",
+            story_public="Story",
+            terms_public="Terms",
+            category="medical",
+            amount_needed_cents=10000,
+            expected_return_days=30,
+            status=CampaignStatus.RUNNING,
+            verified=True,
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = f"/api/v1/campaigns/{self.campaign.id}/support/checkout"
+        self.body = {
+            "amount_cents": 5000,
+            "currency": "EUR",
+            "return_url": "https://example.com/return",
+            "cancel_url": "https://example.com/cancel",
+        }
+
+    def _post(self, body=None, key="key-1"):
+        return self.client.post(
+            self.url, body or self.body, format="json", HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    @patch("payments.gateway.StripeGateway.create_checkout_session")
+    def test_retry_replays_stored_response(self, mock_create):
+        mock_create.return_value = SimpleNamespace(id="cs_idem", url="https://stripe.test/c")
+        first = self._post()
+        self.assertEqual(first.status_code, 201)
+        self.assertNotIn("Idempotent-Replayed", first)
+
+        with self.assertNumQueries(1):
+            replay = self._post()
+        self.assertEqual(replay.status_code, 201)
+        self.assertEqual(replay["Idempotent-Replayed"], "true")
+        self.assertEqual(replay.json(), first.json())
+        self.assertEqual(mock_create.call_count, 1)
+        self.assertEqual(Contribution.objects.count(), 1)
+
+    @patch("payments.gateway.StripeGateway.create_checkout_session")
+    def test_key_reuse_with_different_body_is_rejected(self, mock_create):
+        mock_create.return_value = SimpleNamespace(id="cs_idem", url="https://stripe.test/c")
+        self._post()
+        response = self._post({**self.body, "amount_cents": 4000})
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(mock_create.call_count, 1)
+
+    @patch("payments.gateway.StripeGateway.create_checkout_session")
+    def test_in_flight_key_conflicts(self, mock_create):
+        concurrent = []
+
+        def create_session(*args, **kwargs):
+            concurrent.append(self._post())
+            return SimpleNamespace(id="cs_idem", url="https://stripe.test/c")
+
+        mock_create.side_effect = create_session
+        self.assertEqual(self._post().status_code, 201)
+        self.assertEqual(concurrent[0].status_code, 409)
+        self.assertEqual(mock_create.call_count, 1)
+
+    @patch("payments.gateway.StripeGateway.create_checkout_session")
+    def test_abandoned_claim_is_taken_over_after_its_lease(self, mock_create):
+        # A worker killed mid-request never releases its claim.
+        mock_create.side_effect = SystemExit
+        with self.assertRaises(SystemExit):
+            self._post()
+        lease = timezone.now() + timedelta(seconds=settings.IDEMPOTENCY_CLAIM_TTL)
+        self.assertLessEqual(IdempotencyKey.objects.get().expires_at, lease)
+        mock_create.side_effect = None
+        mock_create.return_value = SimpleNamespace(id="cs_idem", url="https://stripe.test/c")
+        self.assertEqual(self._post().status_code, 409)
+
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self._post().status_code, 201)
+        stored = IdempotencyKey.objects.get()
+        self.assertEqual(stored.status, "COMPLETED")
+        self.assertGreater(stored.expires_at, timezone.now() + timedelta(hours=23))
+
+    @patch("payments.gateway.StripeGateway.create_checkout_session")
+    def test_claim_retried_when_the_winner_already_released_it(self, mock_create):
+        mock_create.return_value = SimpleNamespace(id="cs_idem", url="https://stripe.test/c")
+        create = IdempotencyKey.objects.create
+
+        def claim_after_winner_released(**kwargs):
+            # The concurrent winner inserted first, then failed and deleted its claim.
+            if claim.call_count == 1:
+                raise IntegrityError("uniq_idempotency_key")
+            return create(**kwargs)
+
+        with patch.object(
+            IdempotencyKey.objects, "create", side_effect=claim_after_winner_released
+        ) as claim:
+            response = self._post()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(claim.call_count, 2)
+
+    @patch("payments.gateway.StripeGateway.create_checkout_session")
+    def test_failed_request_releases_key_and_expired_keys_purge(self, mock_create):
+        mock_create.side_effect = RuntimeError("stripe down")
+        with self.assertRaises(RuntimeError):
+            self._post()
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        mock_create.side_effect = None
+        mock_create.return_value = SimpleNamespace(id="cs_idem", url="https://stripe.test/c")
+        self.assertEqual(self._post().status_code, 201)
+
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        out = StringIO()
+        call_command("purge_idempotency_keys", stdout=out)
+        self.assertIn("Deleted 1 expired", out.getvalue())
+
+
+@override_settings(DEBUG=True, PAYMENTS_GATEWAY="payments.gateway.FakeGateway")
+class FakeGatewayTests(APITestCase):
+    def setUp(self):
+        latency.reset()
+        User = get_user_model()
+        self.user = User.objects.create_user(
+            email="fake@example.com", password="StrongPass123", name="Fake"
+        )
+        self.staff = User.objects.create_user(
+            email="staff@example.com", password="StrongPass123", name="Staff", is_staff=True
+        )
+        self.campaign = Campaign.objects.create(
+            title_public="Campaign",
+            story_public="Story",
+            terms_public="Terms",
+            category="medical",
+            amount_needed_cents=10000,
+            expected_return_days=30,
+            status=CampaignStatus.RUNNING,
+            verified=True,
+        )
+
+    def test_checkout_and_webhook_run_without_network(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            f"/api/v1/campaigns/{self.campaign.id}/support/checkout",
+            {
+                "amount_cents": 2500,
+                "currency": "EUR",
+                "return_url": "https://example.com/return",
+                "cancel_url": "https://example.com/cancel",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        session = get_gateway().sessions[-1]
+        self.assertTrue(session.id.startswith("cs_fake_"))
+        self.assertLessEqual(session.expires_at, time.time() + 24 * 3600 - 300)
+        self.assertEqual(response.data["checkout"]["sessionId"], session.id)
+
+        event = {
+            "id": "evt_fake_1",
+            "type": "checkout.session.completed",
+            "data": {"object": {"id": session.id, "metadata": session.metadata}},
+        }
+        response = self.client.post(
+            "/api/v1/payments/webhook", data=json.dumps(event), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+        inbox.drain()
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.amount_pooled_cents, 2500)
+
+        self.client.force_authenticate(user=self.staff)
+        response = self.client.get("/api/v1/admin/metrics/payments-gateway")
+        self.assertEqual(response.status_code, 200)
+        create_stats = response.data["latency"]["checkout.sessions.create"]
+        self.assertEqual(create_stats["count"], 1)
+        self.assertEqual(sum(create_stats["buckets"].values()), 1)
+        self.assertEqual(response.data["latency"]["webhook.construct_event"]["errors"], 0)
+
+    def test_refused_without_debug_and_keeps_recent_sessions_only(self):
+        with override_settings(DEBUG=False), self.assertRaises(ImproperlyConfigured):
+            get_gateway()
+
+        gateway = get_gateway()
+        for _ in range(gateway.max_sessions + 5):
+            gateway.create_checkout_session({"metadata": {}})
+        self.assertEqual(len(gateway.sessions), gateway.max_sessions)
+
+
+@override_settings(DEBUG=True, PAYMENTS_GATEWAY="payments.gateway.FakeGateway")
+class CapacityReservationTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(
+            email="rush@example.com", password="StrongPass123", name="Rush"
+        )
+        self.campaign = Campaign.objects.create(
+            title_public="Campaign",
+            story_public="Story",
+            terms_public="Terms",
+            category="medical",
+            amount_needed_cents=10000,
+            expected_return_days=30,
+            status=CampaignStatus.RUNNING,
+            verified=True,
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def _checkout(self, amount_cents):
+        return self.client.post(
+            f"/api/v1/campaigns/{self.campaign.id}/support/checkout",
+            {
+                "amount_cents": amount_cents,
+                "currency": "EUR",
+                "return_url": "https://example.com/return",
+                "cancel_url": "https://example.com/cancel",
+            },
+            format="json",
+        )
+
+    def _deliver(self, event_type, contribution, event_id):
+        inbox.record_event(
+            {
+                "id": event_id,
+                "type": event_type,
+                "data": {"object": {"metadata": {"contribution_id": str(contribution.id)}}},
+            },
+            b"{}",
+        )
+        inbox.drain()
+
+    def test_pledges_cannot_oversubscribe_goal(self):
+        self.assertEqual(self._checkout(6000).status_code, 201)
+        response = self._checkout(6000)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self._checkout(4000).status_code, 201)
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.reserved_cents, 10000)
+        self.assertEqual(self.campaign.amount_pooled_cents, 0)
+        self.assertEqual(Contribution.objects.count(), 2)
+
+    def test_failed_session_creation_releases_capacity(self):
+        create = "payments.gateway.FakeGateway.create_checkout_session"
+        with patch(create, side_effect=RuntimeError), self.assertRaises(RuntimeError):
+            self._checkout(6000)
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.reserved_cents, 0)
+        self.assertEqual(Contribution.objects.get().status, ContributionStatus.CANCELLED)
+
+    def test_expired_session_releases_and_late_payment_reclaims(self):
+        self._checkout(6000)
+        contribution = Contribution.objects.get()
+
+        self._deliver("checkout.session.expired", contribution, "evt_expired")
+        contribution.refresh_from_db()
+        self.campaign.refresh_from_db()
+        self.assertEqual(contribution.status, ContributionStatus.EXPIRED)
+        self.assertEqual(self.campaign.reserved_cents, 0)
+
+        self._deliver("checkout.session.completed", contribution, "evt_paid")
+        contribution.refresh_from_db()
+        self.campaign.refresh_from_db()
+        self.assertEqual(contribution.status, ContributionStatus.PAID)
+        self.assertEqual(self.campaign.reserved_cents, 6000)
+        self.assertEqual(self.campaign.amount_pooled_cents, 6000)
+
+    def test_late_payment_past_goal_still_disburses_and_completes(self):
+        borrow_request = BorrowRequest.objects.create(
+            requester=self.user,
+            title="Rent",
+            category="medical",
+            reason_detailed="Private",
+            amount_requested_cents=10000,
+            currency="EUR",
+            expected_return_days=30,
+            status=BorrowRequestStatus.CAMPAIGN_CREATED,
+        )
+        Campaign.objects.filter(id=self.campaign.id).update(borrow_request=borrow_request)
+
+        self._checkout(6000)
+        late = Contribution.objects.get()
+        self._deliver("checkout.session.expired", late, "evt_expired")
+        self.assertEqual(self._checkout(10000).status_code, 201)
+        other = Contribution.objects.get(status=ContributionStatus.PLEDGED)
+        self._deliver("checkout.session.completed", other, "evt_other_paid")
+        self._deliver("checkout.session.completed", late, "evt_late_paid")
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, CampaignStatus.FUNDED)
+        self.assertEqual(self.campaign.amount_pooled_cents, 16000)
+
+        staff = get_user_model().objects.create_user(
+            email="staff@example.com", password="StrongPass123", name="Staff", is_staff=True
+        )
+        self.client.force_authenticate(user=staff)
+        disburse_url = f"/api/v1/admin/borrow-requests/br_{borrow_request.id}/disburse"
+        response = self.client.post(disburse_url)
+        self.assertEqual(response.status_code, 200)
+
+        RepaymentPayment.objects.create(
+            borrow_request=borrow_request,
+            amount_cents=10000,
+            currency="EUR",
+            provider="stripe",
+            provider_session_id="cs_final_repayment",
+        )
+        inbox.record_event(
+            {
+                "id": "evt_final_repayment",
+                "type": "checkout.session.completed",
+                "data": {
+                    "object": {
+                        "id": "cs_final_repayment",
+                        "metadata": {"type": "repayment_payment"},
+                    }
+                },
+            },
+            b"{}",
+        )
+        inbox.drain()
+
+        self.assertEqual(WebhookEvent.objects.get(event_id="evt_final_repayment").status, "DONE")
+        borrow_request.refresh_from_db()
+        self.campaign.refresh_from_db()
+        self.assertEqual(borrow_request.status, BorrowRequestStatus.COMPLETED)
+        self.assertEqual(self.campaign.status, CampaignStatus.COMPLETED)
+
+        # Edits to the amounts are still held to the goal.
+        self.campaign.amount_needed_cents = 12000
+        with self.assertRaises(ValidationError):
+            self.campaign.save()
+
+    def test_partly_funded_campaign_reserves_only_remaining_capacity(self):
+        campaign = Campaign.objects.create(
+            title_public="Partly funded",
+            story_public="Story",
+            terms_public="Terms",
+            category="medical",
+            amount_needed_cents=10000,
+            amount_pooled_cents=8000,
+            expected_return_days=30,
+            status=CampaignStatus.RUNNING,
+        )
+        self.assertEqual(campaign.reserved_cents, 8000)
+        self.assertFalse(Campaign.objects.reserve(campaign.id, 5000))
+        self.assertTrue(Campaign.objects.reserve(campaign.id, 1500))
+
+        # Edits to the pool move the counter without dropping live pledges.
+        campaign.amount_pooled_cents = 6000
+        campaign.save()
+        self.assertEqual(campaign.reserved_cents, 7500)
+        campaign.amount_pooled_cents = 8500
+        campaign.save(update_fields=["amount_pooled_cents"])
+        self.assertEqual(campaign.reserved_cents, 10000)
+        self.assertFalse(Campaign.objects.reserve(campaign.id, 1))
+
+    def test_confirmed_payment_keeps_reservation(self):
+        self._checkout(10000)
+        self._deliver("checkout.session.completed", Contribution.objects.get(), "evt_paid")
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.reserved_cents, 10000)
+        self.assertEqual(self.campaign.status, CampaignStatus.FUNDED)
+        self.assertEqual(self._checkout(100).status_code, 400)
+
+
+class ExpirePledgesTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(
+            email="sweep@example.com", password="StrongPass123", name="Sweep"
+        )
+        self.campaigns = [
+            Campaign.objects.create(
+                title_public=f"Campaign {idx}",
+                story_public="Story",
+                terms_public="Terms",
+                category="medical",
+                amount_needed_cents=10000,
+                expected_return_days=30,
+                status=CampaignStatus.RUNNING,
+                verified=True,
+            )
+            for idx in range(2)
+        ]
+
+    def _pledge(self, campaign, amount_cents, age, status=ContributionStatus.PLEDGED):
+        Campaign.objects.reserve(campaign.id, amount_cents)
+        contribution = Contribution.objects.create(
+            contributor=self.user,
+            campaign=campaign,
+            amount_cents=amount_cents,
+            status=status,
+            provider=PaymentProvider.STRIPE,
+            provider_session_id=f"cs_sweep_{Contribution.objects.count()}",
+        )
+        Contribution.objects.filter(id=contribution.id).update(created_at=timezone.now() - age)
+        return contribution
+
+    @override_settings(STRIPE_CHECKOUT_SESSION_TTL=3600)
+    def test_sweeps_stale_pledges_in_chunks(self):
+        first, second = self.campaigns
+        for _ in range(3):
+            self._pledge(first, 1000, timedelta(hours=2))
+        self._pledge(second, 2000, timedelta(hours=2))
+        fresh = self._pledge(second, 500, timedelta(minutes=5))
+        paid = self._pledge(first, 700, timedelta(hours=3), status=ContributionStatus.PAID)
+
+        out = StringIO()
+        call_command("expire_pledges", chunk_size=2, stdout=out)
+        self.assertIn("Expired 4 pledges in 2 chunks, released 5000 cents", out.getvalue())
+
+        self.assertEqual(
+            Contribution.objects.filter(status=ContributionStatus.EXPIRED).count(), 4
+        )
+        fresh.refresh_from_db()
+        paid.refresh_from_db()
+        self.assertEqual(fresh.status, ContributionStatus.PLEDGED)
+        self.assertEqual(paid.status, ContributionStatus.PAID)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.reserved_cents, 700)
+        self.assertEqual(second.reserved_cents, 500)
+
+        out = StringIO()
+        call_command("expire_pledges", stdout=out)
+        self.assertIn("Expired 0 pledges", out.getvalue())
+
+    @override_settings(STRIPE_CHECKOUT_SESSION_TTL=24 * 3600)
+    def test_sweep_uses_ttl_clamped_inside_stripe_window(self):
+        self.assertEqual(checkout_session_ttl(), 24 * 3600 - 300)
+        stale = self._pledge(self.campaigns[0], 1000, timedelta(hours=23, minutes=57))
+        fresh = self._pledge(self.campaigns[0], 1000, timedelta(hours=23, minutes=50))
+
+        call_command("expire_pledges", stdout=StringIO())
+        stale.refresh_from_db()
+        fresh.refresh_from_db()
+        self.assertEqual(stale.status, ContributionStatus.EXPIRED)
+        self.assertEqual(fresh.status, ContributionStatus.PLEDGED)
+
+        with override_settings(STRIPE_CHECKOUT_SESSION_TTL=60):
+            self.assertEqual(checkout_session_ttl(), 35 * 60)
+
+
+class WebhookDispatchTests(TestCase):
+    def test_dispatch_routes_on_event_and_metadata_type(self):
+        seen = []
+        register("checkout.session.completed", "test_dispatch")(seen.append)
+
+        def event(event_type, metadata):
+            return {"type": event_type, "data": {"object": {"metadata": metadata}}}
+
+        dispatch(event("checkout.session.completed", {"type": "test_dispatch"}))
+        dispatch(event("checkout.session.expired", {"type": "test_dispatch"}))
+        dispatch(event("checkout.session.completed", {"type": "other"}))
+        self.assertEqual(len(seen), 1)
+
+        self.assertEqual(session_type({"metadata": {"contribution_id": "x"}}), "contribution")
+        self.assertIsNone(session_type({"metadata": {}}))
+
+
+class LedgerTests(TestCase):
+    def test_contribution_payment_posts_balanced_entries(self):
+        User = get_user_model()
+        user = User.objects.create_user(
+            email="ledger@example.com", password="StrongPass123", name="Ledger"
+        )
+        campaign = Campaign.objects.create(
+            title_public="Campaign",
+            story_public="Story",
+            terms_public="Terms",
+            category="medical",
+            amount_needed_cents=10000,
+            expected_return_days=30,
+            status=CampaignStatus.RUNNING,
+            verified=True,
+        )
+        contribution = Contribution.objects.create(
+            contributor=user,
+            campaign=campaign,
+            amount_cents=2500,
+            provider=PaymentProvider.STRIPE,
+            provider_session_id="cs_ledger",
+        )
+        event = {
+            "id": "evt_ledger",
+            "type": "checkout.session.completed",
+            "data": {"object": {"metadata": {"contribution_id": str(contribution.id)}}},
+        }
+        inbox.record_event(event, b"{}")
+        inbox.drain()
+
+        entries = PlatformLedger.objects.filter(related_contribution=contribution)
+        self.assertEqual(entries.count(), 2)
+        self.assertEqual(len({entry.transaction_id for entry in entries}), 1)
+        self.assertEqual(ledger.balance(LedgerAccount.CASH), 2500)
+        self.assertEqual(ledger.balance(LedgerAccount.CAMPAIGN_ESCROW), -2500)
+        self.assertEqual(sum(ledger.balances().values()), 0)
+
+    def test_unbalanced_transaction_is_rejected(self):
+        with self.assertRaises(ledger.UnbalancedTransaction):
+            ledger.post(
+                "REPAYMENT",
+                [(LedgerAccount.CASH, ledger.DEBIT, 100), (LedgerAccount.CASH, ledger.CREDIT, 90)],
+                "EUR",
+            )
+        self.assertFalse(PlatformLedger.objects.exists())
+
+    def test_balance_reads_snapshot_plus_delta(self):
+        for _ in range(5):
+            ledger.record_default_cover(None, 100, "EUR")
+        snapshots = ledger.snapshot_balances(as_of=timezone.now())
+        self.assertEqual(len(snapshots), len(LedgerAccount.values))
+        self.assertEqual(
+            LedgerBalanceSnapshot.objects.get(account=LedgerAccount.DEFAULT_LOSS).balance_cents, 500
+        )
+
+        ledger.record_default_cover(None, 50, "EUR")
+        with self.assertNumQueries(2):
+            self.assertEqual(ledger.balance(LedgerAccount.DEFAULT_LOSS), 550)
+
+        # Entries behind a snapshot are not re-read: the snapshot is trusted.
+        LedgerBalanceSnapshot.objects.filter(account=LedgerAccount.DEFAULT_LOSS).update(
+            balance_cents=1000
+        )
+        self.assertEqual(ledger.balance(LedgerAccount.DEFAULT_LOSS), 1050)
+
+        out = StringIO()
+        with override_settings(LEDGER_SNAPSHOT_LAG=0):
+            call_command("snapshot_ledger_balances", stdout=out)
+        self.assertIn("DEFAULT_LOSS: 1050", out.getvalue())
+        self.assertIn("BORROWER_RECEIVABLE: -550", out.getvalue())
@@ -4,5 +4,7 @@ from .views import StripeWebhookView, SupportCheckoutView
 
 urlpatterns = [
     path("campaigns/<str:campaign_id>/support/checkout", SupportCheckoutView.as_view(), name="support-checkout"),
+    path("stripe/webhook", StripeWebhookView.as_view(), name="stripe-webhook"),
+    # Legacy alias of stripe/webhook for endpoints still configured in Stripe.
     path("payments/webhook", StripeWebhookView.as_view(), name="payments-webhook"),
 ]
@@ -1,30 +1,36 @@
+import time
 import uuid
 
-import stripe
-from django.conf import settings
 from django.db import transaction
-from django.db.models import Sum
 from django.shortcuts import get_object_or_404
-from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from drf_spectacular.utils import extend_schema
 from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from stripe.error import SignatureVerificationError
+from stripe import SignatureVerificationError
 
 from campaigns.models import Campaign, CampaignStatus
+from core.idempotency import idempotent
+from core.throttling import UserThrottle
 from core.utils import parse_prefixed_uuid
 
+from .gateway import get_gateway
+from .inbox import record_event
 from .models import Contribution, ContributionStatus, PaymentProvider
+from .pledges import checkout_session_ttl, release_pledge
 from .serializers import SupportCheckoutRequestSerializer, SupportCheckoutResponseSerializer
+from .webhooks import CONTRIBUTION
 
 
 class SupportCheckoutView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [UserThrottle]
+    throttle_scope = "checkout"
 
     @extend_schema(request=SupportCheckoutRequestSerializer, responses=SupportCheckoutResponseSerializer)
+    @idempotent
     def post(self, request, campaign_id):
         campaign_id = parse_prefixed_uuid("c", campaign_id)
         if campaign_id is None:
@@ -38,51 +44,58 @@ class SupportCheckoutView(APIView):
         return_url = serializer.validated_data["return_url"]
         cancel_url = serializer.validated_data["cancel_url"]
 
-        paid_total = (
-            Contribution.objects.filter(campaign=campaign, status=ContributionStatus.PAID).aggregate(
-                total=Sum("amount_cents")
-            )["total"]
-            or 0
-        )
-        remaining = campaign.amount_needed_cents - paid_total
-        if amount_cents > remaining:
+        if campaign.status != CampaignStatus.RUNNING:
             return Response(
-                {"detail": "Amount exceeds remaining campaign need."},
+                {"detail": "Campaign is not accepting support."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        contribution = Contribution.objects.create(
-            contributor=request.user,
-            campaign=campaign,
-            amount_cents=amount_cents,
-            currency=currency,
-            status=ContributionStatus.PLEDGED,
-            provider=PaymentProvider.STRIPE,
-            provider_session_id=f"pending_{uuid.uuid4()}",
-        )
+        with transaction.atomic():
+            if not Campaign.objects.reserve(campaign.id, amount_cents):
+                return Response(
+                    {"detail": "Amount exceeds remaining campaign need."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            contribution = Contribution.objects.create(
+                contributor=request.user,
+                campaign=campaign,
+                amount_cents=amount_cents,
+                currency=currency,
+                status=ContributionStatus.PLEDGED,
+                provider=PaymentProvider.STRIPE,
+                provider_session_id=f"pending_{uuid.uuid4()}",
+            )
 
-        stripe.api_key = settings.STRIPE_SECRET_KEY
-        session = stripe.checkout.Session.create(
-            mode="payment",
-            success_url=return_url,
-            cancel_url=cancel_url,
-            payment_method_types=["card"],
-            line_items=[
+        try:
+            session = get_gateway().create_checkout_session(
                 {
-                    "price_data": {
-                        "currency": currency.lower(),
-                        "product_data": {"name": campaign.title_public},
-                        "unit_amount": amount_cents,
+                    "mode": "payment",
+                    "expires_at": int(time.time()) + checkout_session_ttl(),
+                    "success_url": return_url,
+                    "cancel_url": cancel_url,
+                    "payment_method_types": ["card"],
+                    "line_items": [
+                        {
+                            "price_data": {
+                                "currency": currency.lower(),
+                                "product_data": {"name": campaign.title_public},
+                                "unit_amount": amount_cents,
+                            },
+                            "quantity": 1,
+                        }
+                    ],
+                    "metadata": {
+                        "type": CONTRIBUTION,
+                        "contribution_id": str(contribution.id),
+                        "campaign_id": str(campaign.id),
+                        "user_id": str(request.user.id),
                     },
-                    "quantity": 1,
-                }
-            ],
-            metadata={
-                "contribution_id": str(contribution.id),
-                "campaign_id": str(campaign.id),
-                "user_id": str(request.user.id),
-            },
-        )
+                },
+                idempotency_key=f"contribution-{contribution.id}",
+            )
+        except Exception:
+            release_pledge(contribution.id, status=ContributionStatus.CANCELLED)
+            raise
 
         contribution.provider_session_id = session.id
         contribution.save(update_fields=["provider_session_id"])
@@ -108,51 +121,11 @@ class StripeWebhookView(APIView):
     def post(self, request):
         payload = request.body
         sig_header = request.META.get("HTTP_STRIPE_SIGNATURE")
-        stripe.api_key = settings.STRIPE_SECRET_KEY
 
         try:
-            event = stripe.Webhook.construct_event(
-                payload=payload, sig_header=sig_header, secret=settings.STRIPE_WEBHOOK_SECRET
-            )
+            event = get_gateway().construct_event(payload, sig_header)
         except (ValueError, SignatureVerificationError):
             return Response(status=status.HTTP_400_BAD_REQUEST)
 
-        if event.get("type") != "checkout.session.completed":
-            return Response(status=status.HTTP_200_OK)
-
-        session = event.get("data", {}).get("object", {})
-        metadata = session.get("metadata", {})
-        contribution_id = metadata.get("contribution_id")
-        if not contribution_id:
-            return Response(status=status.HTTP_200_OK)
-
-        with transaction.atomic():
-            contribution = (
-                Contribution.objects.select_for_update()
-                .filter(id=contribution_id)
-                .select_related("campaign")
-                .first()
-            )
-            if not contribution:
-                return Response(status=status.HTTP_200_OK)
-            if contribution.status == ContributionStatus.PAID:
-                return Response(status=status.HTTP_200_OK)
-
-            contribution.status = ContributionStatus.PAID
-            contribution.paid_at = timezone.now()
-            contribution.provider_session_id = session.get("id", contribution.provider_session_id)
-            contribution.save(update_fields=["status", "paid_at", "provider_session_id"])
-
-            campaign = Campaign.objects.select_for_update().get(id=contribution.campaign_id)
-            paid_total = (
-                Contribution.objects.filter(campaign=campaign, status=ContributionStatus.PAID).aggregate(
-                    total=Sum("amount_cents")
-                )["total"]
-                or 0
-            )
-            campaign.amount_pooled_cents = paid_total
-            if campaign.amount_pooled_cents >= campaign.amount_needed_cents:
-                campaign.status = CampaignStatus.FUNDED
-            campaign.save(update_fields=["amount_pooled_cents", "status"])
-
+        record_event(event, payload)
         return Response(status=status.HTTP_200_OK)
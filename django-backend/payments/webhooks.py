@@ -0,0 +1,96 @@
+"""
+Stripe webhook dispatch.
+
+Every checkout session we create carries `metadata.type`. Apps register
+handlers for an (event type, metadata type) pair; the inbox worker hands each
+stored event to `dispatch`, which runs only the handlers for that pair.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from campaigns.models import Campaign
+
+from . import ledger
+from .models import Contribution, ContributionStatus
+from .pledges import release_pledge
+
+CONTRIBUTION = "contribution"
+
+_handlers = defaultdict(list)
+
+
+def register(event_type, metadata_type):
+    """Register the decorated function for `event_type` sessions tagged `metadata_type`."""
+
+    def decorator(handler):
+        _handlers[(event_type, metadata_type)].append(handler)
+        return handler
+
+    return decorator
+
+
+def session_type(session):
+    metadata = session.get("metadata") or {}
+    # Contribution sessions created before the type tag only carry the id.
+    return metadata.get("type") or (CONTRIBUTION if metadata.get("contribution_id") else None)
+
+
+def dispatch(event):
+    session = event.get("data", {}).get("object", {})
+    for handler in _handlers.get((event.get("type"), session_type(session)), ()):
+        handler(event)
+
+
+@register("checkout.session.completed", CONTRIBUTION)
+def handle_contribution_payment(event):
+    """Mark a contribution paid and add it to its campaign pool. Safe to replay."""
+    session = event.get("data", {}).get("object", {})
+    metadata = session.get("metadata", {})
+    contribution_id = metadata.get("contribution_id")
+    if not contribution_id:
+        return
+
+    with transaction.atomic():
+        contribution = (
+            Contribution.objects.filter(id=contribution_id)
+            .values("campaign_id", "amount_cents", "currency")
+            .first()
+        )
+        if not contribution:
+            return
+
+        updates = {"status": ContributionStatus.PAID, "paid_at": timezone.now()}
+        if session.get("id"):
+            updates["provider_session_id"] = session["id"]
+        # Only the delivery that moves the pledge to PAID may touch the pool.
+        pledges = Contribution.objects.filter(id=contribution_id)
+        claimed = pledges.filter(status=ContributionStatus.PLEDGED).update(**updates)
+        if not claimed:
+            # The pledge expired and gave its capacity back before the money
+            # arrived; the payment stands, so take the capacity again. If other
+            # pledges took it meanwhile the pool ends up past the goal, which
+            # Campaign.clean() allows.
+            claimed = pledges.filter(status=ContributionStatus.EXPIRED).update(**updates)
+            if claimed:
+                Campaign.objects.force_reserve(
+                    contribution["campaign_id"], contribution["amount_cents"]
+                )
+        if claimed:
+            Campaign.objects.add_pooled(contribution["campaign_id"], contribution["amount_cents"])
+            ledger.record_contribution(
+                contribution_id,
+                contribution["campaign_id"],
+                contribution["amount_cents"],
+                contribution["currency"],
+            )
+
+
+@register("checkout.session.expired", CONTRIBUTION)
+def handle_contribution_session_expired(event):
+    """Expire the pledge behind an abandoned checkout and release its capacity."""
+    metadata = event.get("data", {}).get("object", {}).get("metadata", {})
+    contribution_id = metadata.get("contribution_id")
+    if contribution_id:
+        release_pledge(contribution_id)
@@ -0,0 +1,58 @@
+from django.db.models import F
+
+from borrow.models import BorrowRequest
+
+from .models import RepaymentAllocation, RepaymentScheduleItem, RepaymentScheduleStatus
+
+OPEN_SCHEDULE_STATUSES = (RepaymentScheduleStatus.SCHEDULED, RepaymentScheduleStatus.LATE)
+
+
+def allocate_payment(payment):
+    """
+    Apply a PAID repayment to the borrow request's open schedule items, oldest
+    due date first, partially paying the last one it reaches. Reads only open
+    items, then does one bulk insert of allocations, one bulk update of paid
+    amounts and one UPDATE flipping fully paid items to PAID. Anything beyond
+    the open balance is left unallocated. Must run inside the transaction that
+    marked the payment PAID; replaying a payment is a no-op.
+    """
+    if RepaymentAllocation.objects.filter(repayment_payment=payment).exists():
+        return []
+
+    remaining = payment.amount_cents
+    allocations = []
+    items = []
+    settled_late = 0
+    for item_id, amount, paid, item_status in (
+        RepaymentScheduleItem.objects.select_for_update()
+        .filter(borrow_request_id=payment.borrow_request_id, status__in=OPEN_SCHEDULE_STATUSES)
+        .order_by("due_date", "id")
+        .values_list("id", "amount_cents", "amount_paid_cents", "status")
+    ):
+        if remaining <= 0:
+            break
+        share = min(amount - paid, remaining)
+        if share <= 0:
+            continue
+        remaining -= share
+        allocations.append(
+            RepaymentAllocation(
+                repayment_payment=payment, schedule_item_id=item_id, amount_cents=share
+            )
+        )
+        items.append(RepaymentScheduleItem(id=item_id, amount_paid_cents=paid + share))
+        if paid + share >= amount and item_status == RepaymentScheduleStatus.LATE:
+            settled_late += 1
+    if not allocations:
+        return []
+
+    RepaymentAllocation.objects.bulk_create(allocations, batch_size=1000)
+    RepaymentScheduleItem.objects.bulk_update(items, ["amount_paid_cents"], batch_size=1000)
+    RepaymentScheduleItem.objects.filter(
+        id__in=[item.id for item in items], amount_paid_cents__gte=F("amount_cents")
+    ).update(status=RepaymentScheduleStatus.PAID)
+    if settled_late:
+        BorrowRequest.objects.filter(id=payment.borrow_request_id).update(
+            late_item_count=F("late_item_count") - settled_late
+        )
+    return allocations
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class RepaymentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'repayments'
+
+    def ready(self):
+        from . import webhooks  # noqa: F401  registers the Stripe webhook handlers
@@ -0,0 +1,87 @@
+from django.db.models import F
+from django.utils import timezone
+
+from campaigns.models import Campaign
+from payments import ledger
+from payments.models import Contribution, ContributionStatus
+
+from .models import RepaymentDistribution
+
+
+def split_pro_rata(amount_cents, weights):
+    """
+    Split `amount_cents` across `weights` in proportion, in whole cents, using
+    largest-remainder rounding: every share is floored, then the leftover cents
+    go one each to the largest fractional parts (earliest weight wins ties).
+    The shares always sum to exactly `amount_cents`.
+    """
+    total = sum(weights)
+    if total <= 0 or amount_cents <= 0:
+        return [0] * len(weights)
+    shares = []
+    remainders = []
+    for idx, weight in enumerate(weights):
+        share, remainder = divmod(amount_cents * weight, total)
+        shares.append(share)
+        remainders.append((-remainder, idx))
+    for _, idx in sorted(remainders)[: amount_cents - sum(shares)]:
+        shares[idx] += 1
+    return shares
+
+
+def distribute_repayment(payment):
+    """
+    Split a PAID repayment across the campaign's outstanding contributions in
+    one pass: one read, one bulk insert of distributions, one bulk update of
+    returned amounts and one UPDATE flipping fully repaid contributions to
+    RETURNED. Must run inside the transaction that marked the payment PAID,
+    with the borrow request locked: the returned amounts are read, then written
+    back as absolute values.
+    """
+    campaign_id = (
+        Campaign.objects.filter(borrow_request_id=payment.borrow_request_id)
+        .values_list("id", flat=True)
+        .first()
+    )
+    if campaign_id is None:
+        return []
+
+    rows = [
+        (contribution_id, amount - returned, returned)
+        for contribution_id, amount, returned in Contribution.objects.filter(
+            campaign_id=campaign_id, status=ContributionStatus.PAID
+        )
+        .order_by("created_at", "id")
+        .values_list("id", "amount_cents", "amount_returned_cents")
+        if amount > returned
+    ]
+    owed = [row[1] for row in rows]
+    # Anything paid beyond what contributors are still owed stays with the platform.
+    amount_cents = min(payment.amount_cents, sum(owed))
+    shares = split_pro_rata(amount_cents, owed)
+
+    distributions = []
+    contributions = []
+    for (contribution_id, _, returned), share in zip(rows, shares):
+        if not share:
+            continue
+        distributions.append(
+            RepaymentDistribution(
+                repayment_payment=payment, contribution_id=contribution_id, amount_cents=share
+            )
+        )
+        contributions.append(
+            Contribution(id=contribution_id, amount_returned_cents=returned + share)
+        )
+    if not distributions:
+        return []
+
+    RepaymentDistribution.objects.bulk_create(distributions, batch_size=1000)
+    Contribution.objects.bulk_update(contributions, ["amount_returned_cents"], batch_size=1000)
+    Contribution.objects.filter(
+        campaign_id=campaign_id,
+        status=ContributionStatus.PAID,
+        amount_returned_cents__gte=F("amount_cents"),
+    ).update(status=ContributionStatus.RETURNED, returned_at=timezone.now())
+    ledger.record_return(None, campaign_id, amount_cents, payment.currency)
+    return distributions
@@ -0,0 +1,28 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from borrow.models import BorrowRequest
+from repayments.allocation import allocate_payment
+from repayments.models import RepaymentAllocation, RepaymentPayment, RepaymentPaymentStatus
+
+
+class Command(BaseCommand):
+    help = "Allocate PAID repayments that predate payment allocation to their schedule items."
+
+    def handle(self, *args, **options):
+        payments = (
+            RepaymentPayment.objects.filter(status=RepaymentPaymentStatus.PAID)
+            .exclude(Exists(RepaymentAllocation.objects.filter(repayment_payment=OuterRef("pk"))))
+            .order_by("paid_at", "created_at")
+        )
+        allocated = 0
+        for payment in payments.iterator():
+            with transaction.atomic():
+                # Same lock order as the repayment webhook: borrow request, then items.
+                BorrowRequest.objects.select_for_update().filter(
+                    id=payment.borrow_request_id
+                ).first()
+                if allocate_payment(payment):
+                    allocated += 1
+        self.stdout.write(self.style.SUCCESS(f"Allocated {allocated} repayments."))
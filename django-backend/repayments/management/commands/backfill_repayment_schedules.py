@@ -0,0 +1,53 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from borrow.models import BorrowRequest, BorrowRequestStatus
+from repayments.models import RepaymentScheduleItem
+from repayments.schedule import build_schedule, schedule_start
+
+
+class Command(BaseCommand):
+    help = "Generate repayment schedules for disbursed borrow requests that have none."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        pending = (
+            BorrowRequest.objects.filter(
+                status__in=(BorrowRequestStatus.DISBURSED, BorrowRequestStatus.IN_REPAYMENT)
+            )
+            .exclude(Exists(RepaymentScheduleItem.objects.filter(borrow_request=OuterRef("pk"))))
+            .only(
+                "id",
+                "amount_requested_cents",
+                "expected_return_days",
+                "disbursed_at",
+                "updated_at",
+                "total_due_cents",
+            )
+            .order_by("id")
+        )
+        requests = items = 0
+        last_id = None
+        while True:
+            batch_qs = pending if last_id is None else pending.filter(id__gt=last_id)
+            batch = list(batch_qs[:batch_size])
+            if not batch:
+                break
+            rows = []
+            for borrow_request in batch:
+                schedule = build_schedule(borrow_request, schedule_start(borrow_request))
+                borrow_request.total_due_cents = sum(item.amount_cents for item in schedule)
+                rows.extend(schedule)
+            with transaction.atomic():
+                RepaymentScheduleItem.objects.bulk_create(rows, batch_size=1000)
+                BorrowRequest.objects.bulk_update(batch, ["total_due_cents"])
+            requests += len(batch)
+            items += len(rows)
+            last_id = batch[-1].id
+        self.stdout.write(
+            self.style.SUCCESS(f"Generated {items} schedule items for {requests} borrow requests.")
+        )
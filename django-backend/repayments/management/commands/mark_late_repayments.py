@@ -0,0 +1,26 @@
+from django.core.management import BaseCommand
+
+from repayments.schedule import mark_late_items
+
+
+class Command(BaseCommand):
+    help = "Mark SCHEDULED repayment items past their due date as LATE."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument(
+            "--grace-days",
+            type=int,
+            default=None,
+            help="Days past due before an item is late; defaults to REPAYMENT_LATE_GRACE_DAYS.",
+        )
+
+    def handle(self, *args, **options):
+        stats = mark_late_items(grace_days=options["grace_days"], chunk_size=options["chunk_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Marked {stats['marked']} items late across {stats['borrow_requests']} "
+                f"borrow requests in {stats['chunks']} chunks; "
+                f"{stats['seconds']:.2f}s ({stats['per_second']:.0f} rows/s)."
+            )
+        )
@@ -0,0 +1,70 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from borrow.models import BorrowRequest
+from repayments.models import RepaymentPayment, RepaymentPaymentStatus, RepaymentScheduleItem
+
+
+def _sum(queryset):
+    return Coalesce(
+        Subquery(
+            queryset.values("borrow_request").annotate(total=Sum("amount_cents")).values("total")
+        ),
+        Value(0),
+    )
+
+
+def _true_totals(queryset):
+    return queryset.annotate(
+        true_due=_sum(RepaymentScheduleItem.objects.filter(borrow_request=OuterRef("pk"))),
+        true_paid=_sum(
+            RepaymentPayment.objects.filter(
+                borrow_request=OuterRef("pk"), status=RepaymentPaymentStatus.PAID
+            )
+        ),
+    )
+
+
+class Command(BaseCommand):
+    help = "Check borrow request repayment totals against schedules and payments and repair drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repair", action="store_true", help="Correct drifted borrow requests."
+        )
+
+    def handle(self, *args, **options):
+        drifted = list(
+            _true_totals(BorrowRequest.objects.all())
+            .exclude(total_due_cents=F("true_due"), total_paid_cents=F("true_paid"))
+            .values_list("id", "total_due_cents", "true_due", "total_paid_cents", "true_paid")
+        )
+        for borrow_request_id, due, true_due, paid, true_paid in drifted:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Borrow request {borrow_request_id}: due {due} (schedule {true_due}), "
+                    f"paid {paid} (payments {true_paid})."
+                )
+            )
+        if not options["repair"]:
+            self.stdout.write(self.style.SUCCESS(f"{len(drifted)} borrow requests drifted."))
+            return
+
+        repaired = 0
+        for borrow_request_id, *_ in drifted:
+            with transaction.atomic():
+                # Recompute under the row lock so a payment landing meanwhile is not undone.
+                borrow_request = _true_totals(
+                    BorrowRequest.objects.select_for_update()
+                ).get(id=borrow_request_id)
+                if (borrow_request.total_due_cents, borrow_request.total_paid_cents) != (
+                    borrow_request.true_due,
+                    borrow_request.true_paid,
+                ):
+                    borrow_request.total_due_cents = borrow_request.true_due
+                    borrow_request.total_paid_cents = borrow_request.true_paid
+                    borrow_request.save(update_fields=["total_due_cents", "total_paid_cents"])
+                    repaired += 1
+        self.stdout.write(self.style.SUCCESS(f"Repaired {repaired} borrow requests."))
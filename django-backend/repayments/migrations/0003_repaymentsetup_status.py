@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('repayments', '0002_repaymentsetup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='repaymentsetup',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='repaymentsetup',
+            name='setup_intent_id',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='repaymentsetup',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('COMPLETED', 'Completed'), ('EXPIRED', 'Expired')], default='PENDING', max_length=20),
+        ),
+    ]
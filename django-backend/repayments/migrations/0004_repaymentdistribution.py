@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:25
+
+import django.core.validators
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0006_contribution_amount_returned_cents'),
+        ('repayments', '0003_repaymentsetup_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RepaymentDistribution',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('amount_cents', models.PositiveBigIntegerField(validators=[django.core.validators.MinValueValidator(0)])),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('contribution', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='distributions', to='payments.contribution')),
+                ('repayment_payment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='distributions', to='repayments.repaymentpayment')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('repayment_payment', 'contribution'), name='uniq_repayment_distribution')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('borrow', '0005_borrowrequest_late_item_count'),
+        ('repayments', '0004_repaymentdistribution'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='repaymentscheduleitem',
+            index=models.Index(condition=models.Q(('status', 'SCHEDULED')), fields=['status', 'due_date'], name='repay_sched_open_due_idx'),
+        ),
+    ]
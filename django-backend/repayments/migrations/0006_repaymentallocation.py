@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:47
+
+import django.core.validators
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('borrow', '0005_borrowrequest_late_item_count'),
+        ('repayments', '0005_repaymentscheduleitem_open_due_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RepaymentAllocation',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('amount_cents', models.PositiveBigIntegerField(validators=[django.core.validators.MinValueValidator(0)])),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='repaymentscheduleitem',
+            name='amount_paid_cents',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='repaymentscheduleitem',
+            index=models.Index(condition=models.Q(('status__in', ['SCHEDULED', 'LATE'])), fields=['borrow_request', 'due_date'], name='repay_sched_open_br_idx'),
+        ),
+        migrations.AddField(
+            model_name='repaymentallocation',
+            name='repayment_payment',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='allocations', to='repayments.repaymentpayment'),
+        ),
+        migrations.AddField(
+            model_name='repaymentallocation',
+            name='schedule_item',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='allocations', to='repayments.repaymentscheduleitem'),
+        ),
+        migrations.AddConstraint(
+            model_name='repaymentallocation',
+            constraint=models.UniqueConstraint(fields=('repayment_payment', 'schedule_item'), name='uniq_repayment_allocation'),
+        ),
+    ]
@@ -4,7 +4,7 @@ from django.core.validators import MinValueValidator
 from django.db import models
 
 from borrow.models import BorrowRequest, Currency
-from payments.models import PaymentProvider
+from payments.models import Contribution, PaymentProvider
 
 
 class RepaymentScheduleStatus(models.TextChoices):
@@ -20,6 +20,12 @@ class RepaymentPaymentStatus(models.TextChoices):
     FAILED = "FAILED", "Failed"
 
 
+class RepaymentSetupStatus(models.TextChoices):
+    PENDING = "PENDING", "Pending"
+    COMPLETED = "COMPLETED", "Completed"
+    EXPIRED = "EXPIRED", "Expired"
+
+
 class RepaymentScheduleItem(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     borrow_request = models.ForeignKey(
@@ -27,12 +33,29 @@ class RepaymentScheduleItem(models.Model):
     )
     due_date = models.DateField()
     amount_cents = models.PositiveBigIntegerField(validators=[MinValueValidator(0)])
+    amount_paid_cents = models.PositiveBigIntegerField(default=0)
     status = models.CharField(
         max_length=20, choices=RepaymentScheduleStatus.choices, default=RepaymentScheduleStatus.SCHEDULED
     )
 
     class Meta:
-        indexes = [models.Index(fields=["status"])]
+        indexes = [
+            models.Index(fields=["status"]),
+            # Only open items are scanned by the late-payment sweep.
+            models.Index(
+                fields=["status", "due_date"],
+                condition=models.Q(status=RepaymentScheduleStatus.SCHEDULED),
+                name="repay_sched_open_due_idx",
+            ),
+            # Payment allocation reads a borrow request's open items oldest first.
+            models.Index(
+                fields=["borrow_request", "due_date"],
+                condition=models.Q(
+                    status__in=[RepaymentScheduleStatus.SCHEDULED, RepaymentScheduleStatus.LATE]
+                ),
+                name="repay_sched_open_br_idx",
+            ),
+        ]
 
 
 class RepaymentPayment(models.Model):
@@ -62,4 +85,51 @@ class RepaymentSetup(models.Model):
     user = models.ForeignKey("accounts.User", related_name="repayment_setups", on_delete=models.CASCADE)
     provider = models.CharField(max_length=20, choices=PaymentProvider.choices)
     provider_session_id = models.CharField(max_length=255, unique=True)
+    status = models.CharField(
+        max_length=20, choices=RepaymentSetupStatus.choices, default=RepaymentSetupStatus.PENDING
+    )
+    setup_intent_id = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+
+class RepaymentDistribution(models.Model):
+    """A contributor's share of one borrower repayment."""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    repayment_payment = models.ForeignKey(
+        RepaymentPayment, related_name="distributions", on_delete=models.CASCADE
+    )
+    contribution = models.ForeignKey(
+        Contribution, related_name="distributions", on_delete=models.CASCADE
+    )
+    amount_cents = models.PositiveBigIntegerField(validators=[MinValueValidator(0)])
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["repayment_payment", "contribution"], name="uniq_repayment_distribution"
+            )
+        ]
+
+
+class RepaymentAllocation(models.Model):
+    """The part of a borrower repayment applied to one schedule item."""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    repayment_payment = models.ForeignKey(
+        RepaymentPayment, related_name="allocations", on_delete=models.CASCADE
+    )
+    schedule_item = models.ForeignKey(
+        RepaymentScheduleItem, related_name="allocations", on_delete=models.CASCADE
+    )
+    amount_cents = models.PositiveBigIntegerField(validators=[MinValueValidator(0)])
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["repayment_payment", "schedule_item"], name="uniq_repayment_allocation"
+            )
+        ]
@@ -0,0 +1,132 @@
+import calendar
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+
+from borrow.models import BorrowRequest
+
+from .models import RepaymentScheduleItem, RepaymentScheduleStatus
+
+
+def add_months(base_date, months):
+    month = base_date.month - 1 + months
+    year = base_date.year + month // 12
+    month = month % 12 + 1
+    day = min(base_date.day, calendar.monthrange(year, month)[1])
+    return date(year, month, day)
+
+
+def build_schedule(borrow_request, start_date):
+    """
+    Unsaved monthly schedule items for `borrow_request`, one per started
+    30-day period from `start_date`. The last item carries the rounding
+    remainder so the items always sum to the requested amount.
+    """
+    total_cents = borrow_request.amount_requested_cents
+    months = max(1, (borrow_request.expected_return_days + 29) // 30)
+    base_amount = total_cents // months
+    remainder = total_cents - (base_amount * months)
+
+    items = []
+    for idx in range(months):
+        amount = base_amount + (remainder if idx == months - 1 else 0)
+        items.append(
+            RepaymentScheduleItem(
+                borrow_request=borrow_request,
+                due_date=add_months(start_date, idx + 1),
+                amount_cents=amount,
+                status=RepaymentScheduleStatus.SCHEDULED,
+            )
+        )
+    return items
+
+
+def schedule_start(borrow_request):
+    disbursed_at = borrow_request.disbursed_at or borrow_request.updated_at or timezone.now()
+    return timezone.localdate(disbursed_at)
+
+
+def generate_schedule(borrow_request, start_date=None):
+    """
+    Create the repayment schedule for a disbursed borrow request. Called once
+    from the disbursement transition; a request that already has a schedule is
+    left alone.
+    """
+    if borrow_request.repayment_schedule.exists():
+        return []
+    items = build_schedule(borrow_request, start_date or schedule_start(borrow_request))
+    total_due = sum(item.amount_cents for item in items)
+    with transaction.atomic():
+        RepaymentScheduleItem.objects.bulk_create(items)
+        BorrowRequest.objects.filter(id=borrow_request.id).update(
+            total_due_cents=F("total_due_cents") + total_due
+        )
+    borrow_request.total_due_cents += total_due
+    return items
+
+
+def mark_late_items(today=None, grace_days=None, chunk_size=1000):
+    """
+    Flip SCHEDULED items whose due date (plus the grace period) has passed to
+    LATE and add them to each borrow request's `late_item_count`. Rows the
+    repayment webhook holds locked are skipped and picked up on the next run,
+    so the sweep never waits on a payment. Returns counts and throughput.
+    """
+    grace_days = settings.REPAYMENT_LATE_GRACE_DAYS if grace_days is None else grace_days
+    cutoff = (today or timezone.localdate()) - timedelta(days=grace_days)
+    started = time.perf_counter()
+    marked = chunks = 0
+    borrow_request_ids = set()
+    cursor = None
+    while True:
+        pending = RepaymentScheduleItem.objects.filter(
+            status=RepaymentScheduleStatus.SCHEDULED, due_date__lt=cutoff
+        )
+        if cursor is not None:
+            pending = pending.filter(
+                Q(due_date__gt=cursor[0]) | Q(due_date=cursor[0], id__gt=cursor[1])
+            )
+        with transaction.atomic():
+            rows = list(
+                pending.select_for_update(skip_locked=True)
+                .order_by("due_date", "id")
+                .values_list("id", "borrow_request_id", "due_date")[:chunk_size]
+            )
+            if not rows:
+                break
+            cursor = (rows[-1][2], rows[-1][0])
+            # Items of a borrow request a payment is settling wait for the next run.
+            locked = set(
+                BorrowRequest.objects.select_for_update(skip_locked=True)
+                .filter(id__in={row[1] for row in rows})
+                .values_list("id", flat=True)
+            )
+            late_ids = [row[0] for row in rows if row[1] in locked]
+            RepaymentScheduleItem.objects.filter(id__in=late_ids).update(
+                status=RepaymentScheduleStatus.LATE
+            )
+            per_request = Counter(row[1] for row in rows if row[1] in locked)
+            if per_request:
+                BorrowRequest.objects.filter(id__in=per_request).update(
+                    late_item_count=F("late_item_count")
+                    + Case(
+                        *(When(id=pk, then=Value(count)) for pk, count in per_request.items()),
+                        default=Value(0),
+                    )
+                )
+        chunks += 1
+        marked += len(late_ids)
+        borrow_request_ids.update(per_request)
+    elapsed = time.perf_counter() - started
+    return {
+        "marked": marked,
+        "borrow_requests": len(borrow_request_ids),
+        "chunks": chunks,
+        "seconds": elapsed,
+        "per_second": marked / elapsed if elapsed else 0.0,
+    }
@@ -1,4 +1,3 @@
-from django.db.models import Sum
 from rest_framework import serializers
 
 from borrow.models import BorrowRequest, Currency
@@ -6,13 +5,13 @@ from core.serializers import CamelCaseSerializerMixin
 from core.utils import parse_prefixed_id
 from payments.models import PaymentProvider
 
-from .models import RepaymentPayment, RepaymentPaymentStatus, RepaymentScheduleItem, RepaymentSetup
+from .models import RepaymentScheduleItem
 
 
 class RepaymentScheduleItemSerializer(CamelCaseSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = RepaymentScheduleItem
-        fields = ["id", "due_date", "amount_cents", "status"]
+        fields = ["id", "due_date", "amount_cents", "amount_paid_cents", "status"]
 
 
 class RepaymentSetupSerializer(CamelCaseSerializerMixin, serializers.Serializer):
@@ -46,41 +45,11 @@ class RepaymentPayResponseSerializer(CamelCaseSerializerMixin, serializers.Seria
     checkout_url = serializers.URLField()
 
 
+class RepaymentTotalsSerializer(CamelCaseSerializerMixin, serializers.Serializer):
+    paid_cents = serializers.IntegerField()
+    remaining_cents = serializers.IntegerField()
+
+
 class RepaymentsMineSerializer(CamelCaseSerializerMixin, serializers.Serializer):
-    schedule = serializers.SerializerMethodField()
-    totals = serializers.SerializerMethodField()
-
-    def _get_borrow_request(self):
-        borrow_request = self.context.get("borrow_request")
-        if borrow_request:
-            return borrow_request
-        return None
-
-    def get_schedule(self, obj):
-        borrow_request = self._get_borrow_request()
-        if not borrow_request:
-            return []
-        schedule = RepaymentScheduleItem.objects.filter(borrow_request=borrow_request).order_by("due_date")
-        return RepaymentScheduleItemSerializer(schedule, many=True).data
-
-    def get_totals(self, obj):
-        borrow_request = self._get_borrow_request()
-        if not borrow_request:
-            return {"paid_cents": 0, "remaining_cents": 0}
-        total_due = (
-            RepaymentScheduleItem.objects.filter(borrow_request=borrow_request).aggregate(
-                total=Sum("amount_cents")
-            )["total"]
-            or 0
-        )
-        total_paid = (
-            RepaymentPayment.objects.filter(
-                borrow_request=borrow_request, status=RepaymentPaymentStatus.PAID
-            ).aggregate(total=Sum("amount_cents"))["total"]
-            or 0
-        )
-        remaining = total_due - total_paid
-        return {
-            "paid_cents": total_paid,
-            "remaining_cents": remaining if remaining > 0 else 0,
-        }
+    schedule = RepaymentScheduleItemSerializer(many=True)
+    totals = RepaymentTotalsSerializer()
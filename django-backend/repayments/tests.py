@@ -1,11 +1,33 @@
+from datetime import date
+from io import StringIO
 from types import SimpleNamespace
 from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase
 
 from borrow.models import BorrowRequest, BorrowRequestStatus
-from repayments.models import RepaymentPayment, RepaymentPaymentStatus, RepaymentScheduleItem
+from campaigns.models import Campaign, CampaignStatus
+from payments import inbox, ledger
+from payments.models import Contribution, ContributionStatus, LedgerAccount
+from repayments.distribution import split_pro_rata
+from repayments.models import (
+    RepaymentAllocation,
+    RepaymentDistribution,
+    RepaymentPayment,
+    RepaymentPaymentStatus,
+    RepaymentScheduleItem,
+    RepaymentScheduleStatus,
+    RepaymentSetup,
+    RepaymentSetupStatus,
+)
+from repayments.projection import project_cash_flow
+from repayments.schedule import add_months, generate_schedule, mark_late_items
+from repayments.webhooks import handle_repayment_payment
 
 
 class RepaymentsMineTests(APITestCase):
@@ -24,6 +46,7 @@ class RepaymentsMineTests(APITestCase):
             expected_return_days=45,
             status=BorrowRequestStatus.DISBURSED,
         )
+        generate_schedule(self.borrow_request)
 
     def test_schedule_generated_and_totals(self):
         self.client.force_authenticate(user=self.user)
@@ -43,13 +66,22 @@ class RepaymentsMineTests(APITestCase):
             currency="EUR",
             provider="stripe",
             provider_session_id="repayment_paid",
-            status=RepaymentPaymentStatus.PAID,
         )
+        handle_repayment_payment({"data": {"object": {"id": "repayment_paid"}}})
         response = self.client.get("/api/v1/repayments/mine")
         self.assertEqual(response.data["totals"]["paidCents"], 4000)
         self.assertEqual(response.data["totals"]["remainingCents"], 6000)
 
-    @patch("repayments.views.stripe.checkout.Session.create")
+    def test_mine_is_a_read(self):
+        RepaymentScheduleItem.objects.all().delete()
+        self.client.force_authenticate(user=self.user)
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/v1/repayments/mine")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["schedule"], [])
+        self.assertFalse(RepaymentScheduleItem.objects.exists())
+
+    @patch("payments.gateway.StripeGateway.create_checkout_session")
     def test_setup_and_pay(self, mock_create):
         mock_create.return_value = SimpleNamespace(id="cs_setup_123", url="https://stripe.test/setup")
         self.client.force_authenticate(user=self.user)
@@ -71,7 +103,7 @@ class RepaymentsMineTests(APITestCase):
         self.assertEqual(response.status_code, 201)
         self.assertEqual(response.data["checkoutUrl"], "https://stripe.test/pay")
 
-    @patch("repayments.views.stripe.Webhook.construct_event")
+    @patch("payments.gateway.StripeGateway.construct_event")
     def test_repayments_webhook_marks_paid(self, mock_construct_event):
         payment = RepaymentPayment.objects.create(
             borrow_request=self.borrow_request,
@@ -92,5 +124,375 @@ class RepaymentsMineTests(APITestCase):
             HTTP_STRIPE_SIGNATURE="sig",
         )
         self.assertEqual(response.status_code, 200)
+        call_command("process_webhooks", once=True, stdout=StringIO())
         payment.refresh_from_db()
         self.assertEqual(payment.status, RepaymentPaymentStatus.PAID)
+
+    @patch("payments.gateway.StripeGateway.construct_event")
+    def test_unified_webhook_completes_setup_sessions(self, mock_construct_event):
+        setup = RepaymentSetup.objects.create(
+            borrow_request=self.borrow_request,
+            user=self.user,
+            provider="stripe",
+            provider_session_id="cs_setup_123",
+        )
+        mock_construct_event.return_value = {
+            "id": "evt_setup_1",
+            "type": "checkout.session.completed",
+            "data": {
+                "object": {
+                    "id": "cs_setup_123",
+                    "mode": "setup",
+                    "setup_intent": "seti_123",
+                    "metadata": {"type": "repayment_setup"},
+                }
+            },
+        }
+        for url in ("/api/v1/stripe/webhook", "/api/v1/repayments/webhook"):
+            response = self.client.post(
+                url, data="{}", content_type="application/json", HTTP_STRIPE_SIGNATURE="sig"
+            )
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_construct_event.call_count, 2)
+
+        call_command("process_webhooks", once=True, stdout=StringIO())
+        setup.refresh_from_db()
+        self.assertEqual(setup.status, RepaymentSetupStatus.COMPLETED)
+        self.assertEqual(setup.setup_intent_id, "seti_123")
+        self.assertIsNotNone(setup.completed_at)
+
+
+class RepaymentDistributionTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.borrower = User.objects.create_user(
+            email="borrower@example.com", password="StrongPass123", name="Borrower"
+        )
+        self.borrow_request = BorrowRequest.objects.create(
+            requester=self.borrower,
+            title="Rent",
+            category="rent",
+            reason_detailed="Private",
+            amount_requested_cents=60000,
+            currency="EUR",
+            expected_return_days=180,
+            status=BorrowRequestStatus.DISBURSED,
+        )
+        self.campaign = Campaign.objects.create(
+            borrow_request=self.borrow_request,
+            title_public="Rent",
+            story_public="Story",
+            terms_public="Terms",
+            category="rent",
+            amount_needed_cents=60000,
+            expected_return_days=180,
+            status=CampaignStatus.DISBURSED,
+            verified=True,
+        )
+
+    def _support(self, amounts):
+        supporter = get_user_model().objects.create_user(
+            email="supporter@example.com", password="StrongPass123", name="Supporter"
+        )
+        return Contribution.objects.bulk_create(
+            Contribution(
+                contributor=supporter,
+                campaign=self.campaign,
+                amount_cents=amount,
+                status=ContributionStatus.PAID,
+                provider="stripe",
+                provider_session_id=f"cs_support_{idx}",
+            )
+            for idx, amount in enumerate(amounts)
+        )
+
+    def _repay(self, amount_cents, number):
+        RepaymentPayment.objects.create(
+            borrow_request=self.borrow_request,
+            amount_cents=amount_cents,
+            currency="EUR",
+            provider="stripe",
+            provider_session_id=f"cs_repay_{number}",
+        )
+        inbox.record_event(
+            {
+                "id": f"evt_repay_{number}",
+                "type": "checkout.session.completed",
+                "data": {
+                    "object": {
+                        "id": f"cs_repay_{number}",
+                        "metadata": {"type": "repayment_payment"},
+                    }
+                },
+            },
+            b"{}",
+        )
+        inbox.drain()
+
+    def test_split_is_exact_with_largest_remainder(self):
+        self.assertEqual(split_pro_rata(10000, [20000, 25000, 15000]), [3333, 4167, 2500])
+        self.assertEqual(split_pro_rata(2, [1, 1, 1]), [1, 1, 0])
+        self.assertEqual(split_pro_rata(0, [5, 5]), [0, 0])
+
+    def test_monthly_repayments_return_every_contribution(self):
+        a, b, c = self._support([20000, 25000, 15000])
+        self._repay(10000, 1)
+        shares = dict(
+            RepaymentDistribution.objects.values_list("contribution_id", "amount_cents")
+        )
+        self.assertEqual(shares, {a.id: 3333, b.id: 4167, c.id: 2500})
+
+        for number in range(2, 7):
+            self._repay(10000, number)
+        for contribution in (a, b, c):
+            contribution.refresh_from_db()
+            self.assertEqual(contribution.status, ContributionStatus.RETURNED)
+            self.assertEqual(contribution.amount_returned_cents, contribution.amount_cents)
+            self.assertIsNotNone(contribution.returned_at)
+        self.assertEqual(RepaymentDistribution.objects.count(), 18)
+        self.assertEqual(ledger.balance(LedgerAccount.CASH), 0)
+
+    def test_borrow_request_locked_before_distribution(self):
+        self._support([20000, 40000])
+        with CaptureQueriesContext(connection) as queries:
+            self._repay(10000, 1)
+        reads = [query["sql"] for query in queries.captured_queries]
+
+        def first(table):
+            return next(
+                idx
+                for idx, sql in enumerate(reads)
+                if sql.startswith("SELECT") and f'FROM "{table}"' in sql
+            )
+
+        self.assertLess(first("borrow_borrowrequest"), first("payments_contribution"))
+
+    def test_thousands_of_supporters_in_one_pass(self):
+        contributions = self._support([37 + idx % 11 for idx in range(1500)])
+        owed = sum(contribution.amount_cents for contribution in contributions)
+        with CaptureQueriesContext(connection) as queries:
+            self._repay(owed // 3, 1)
+        contribution_reads = [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith("SELECT") and 'FROM "payments_contribution"' in query["sql"]
+        ]
+        self.assertEqual(len(contribution_reads), 1)
+        self.assertEqual(
+            sum(RepaymentDistribution.objects.values_list("amount_cents", flat=True)), owed // 3
+        )
+
+
+class RepaymentScheduleTests(TestCase):
+    def setUp(self):
+        self.borrower = get_user_model().objects.create_user(
+            email="scheduled@example.com", password="StrongPass123", name="Borrower"
+        )
+
+    def _borrow_request(self, days, status=BorrowRequestStatus.DISBURSED):
+        return BorrowRequest.objects.create(
+            requester=self.borrower,
+            title="Borrow",
+            category="rent",
+            reason_detailed="Private",
+            amount_requested_cents=10001,
+            currency="EUR",
+            expected_return_days=days,
+            status=status,
+        )
+
+    def test_generate_schedule_once(self):
+        borrow_request = self._borrow_request(90)
+        items = generate_schedule(borrow_request, start_date=date(2026, 1, 31))
+        self.assertEqual([item.amount_cents for item in items], [3333, 3333, 3335])
+        self.assertEqual(
+            [item.due_date for item in items],
+            [date(2026, 2, 28), date(2026, 3, 31), date(2026, 4, 30)],
+        )
+        self.assertEqual(generate_schedule(borrow_request), [])
+        self.assertEqual(borrow_request.repayment_schedule.count(), 3)
+        self.assertEqual(add_months(date(2024, 1, 31), 1), date(2024, 2, 29))
+
+    def test_backfill_only_disbursed_without_schedule(self):
+        missing = [self._borrow_request(30 * n) for n in (1, 2, 3)]
+        in_repayment = self._borrow_request(60, status=BorrowRequestStatus.IN_REPAYMENT)
+        existing = self._borrow_request(60)
+        generate_schedule(existing)
+        submitted = self._borrow_request(60, status=BorrowRequestStatus.SUBMITTED)
+
+        out = StringIO()
+        call_command("backfill_repayment_schedules", batch_size=2, stdout=out)
+        self.assertIn("Generated 8 schedule items for 4 borrow requests", out.getvalue())
+        for borrow_request, expected in zip(missing + [in_repayment, existing], [1, 2, 3, 2, 2]):
+            self.assertEqual(borrow_request.repayment_schedule.count(), expected)
+            borrow_request.refresh_from_db()
+            self.assertEqual(borrow_request.total_due_cents, 10001)
+        self.assertFalse(submitted.repayment_schedule.exists())
+
+        call_command("backfill_repayment_schedules", stdout=out)
+        self.assertEqual(RepaymentScheduleItem.objects.count(), 10)
+
+    def test_totals_maintained_and_verified(self):
+        borrow_request = self._borrow_request(60)
+        generate_schedule(borrow_request)
+        RepaymentPayment.objects.create(
+            borrow_request=borrow_request,
+            amount_cents=10001,
+            currency="EUR",
+            provider="stripe",
+            provider_session_id="cs_totals",
+        )
+        event = {"data": {"object": {"id": "cs_totals"}}}
+        handle_repayment_payment(event)
+        handle_repayment_payment(event)
+        borrow_request.refresh_from_db()
+        self.assertEqual(borrow_request.total_due_cents, 10001)
+        self.assertEqual(borrow_request.total_paid_cents, 10001)
+        self.assertEqual(borrow_request.status, BorrowRequestStatus.COMPLETED)
+
+        out = StringIO()
+        call_command("verify_repayment_totals", stdout=out)
+        self.assertIn("0 borrow requests drifted", out.getvalue())
+
+        BorrowRequest.objects.filter(id=borrow_request.id).update(
+            total_due_cents=1, total_paid_cents=0
+        )
+        out = StringIO()
+        call_command("verify_repayment_totals", repair=True, stdout=out)
+        self.assertIn("Repaired 1 borrow requests", out.getvalue())
+        borrow_request.refresh_from_db()
+        self.assertEqual(borrow_request.total_due_cents, 10001)
+        self.assertEqual(borrow_request.total_paid_cents, 10001)
+
+    def test_mark_late_items_in_chunks(self):
+        first, second = self._borrow_request(90), self._borrow_request(60)
+        generate_schedule(first, start_date=date(2026, 1, 10))
+        generate_schedule(second, start_date=date(2026, 2, 10))
+        RepaymentScheduleItem.objects.filter(
+            borrow_request=first, due_date=date(2026, 2, 10)
+        ).update(status=RepaymentScheduleStatus.PAID)
+
+        with override_settings(REPAYMENT_LATE_GRACE_DAYS=3):
+            stats = mark_late_items(today=date(2026, 4, 10), chunk_size=1)
+        # Due 2026-03-10 on both requests; 2026-04-10 is still inside the grace period.
+        self.assertEqual((stats["marked"], stats["borrow_requests"], stats["chunks"]), (2, 2, 2))
+        self.assertEqual(mark_late_items(today=date(2026, 4, 10), grace_days=3)["marked"], 0)
+
+        out = StringIO()
+        call_command("mark_late_repayments", chunk_size=2, stdout=out)
+        self.assertIn("Marked 2 items late across 2 borrow requests", out.getvalue())
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.late_item_count, second.late_item_count), (2, 2))
+        self.assertEqual(
+            RepaymentScheduleItem.objects.filter(status=RepaymentScheduleStatus.LATE).count(), 4
+        )
+
+    def _pay(self, borrow_request, amount_cents, session_id):
+        RepaymentPayment.objects.create(
+            borrow_request=borrow_request,
+            amount_cents=amount_cents,
+            currency="EUR",
+            provider="stripe",
+            provider_session_id=session_id,
+        )
+        handle_repayment_payment({"data": {"object": {"id": session_id}}})
+
+    def test_payments_allocated_oldest_first(self):
+        borrow_request = self._borrow_request(90)
+        first, second, third = generate_schedule(borrow_request, start_date=date(2026, 1, 10))
+        mark_late_items(today=date(2026, 3, 1))
+        borrow_request.refresh_from_db()
+        self.assertEqual(borrow_request.late_item_count, 1)
+
+        self._pay(borrow_request, 5000, "cs_alloc_1")
+        handle_repayment_payment({"data": {"object": {"id": "cs_alloc_1"}}})
+        items = {item.id: item for item in RepaymentScheduleItem.objects.all()}
+        self.assertEqual(
+            [(items[i.id].amount_paid_cents, items[i.id].status) for i in (first, second, third)],
+            [
+                (3333, RepaymentScheduleStatus.PAID),
+                (1667, RepaymentScheduleStatus.SCHEDULED),
+                (0, RepaymentScheduleStatus.SCHEDULED),
+            ],
+        )
+        borrow_request.refresh_from_db()
+        self.assertEqual(borrow_request.late_item_count, 0)
+
+        self._pay(borrow_request, 6000, "cs_alloc_2")
+        allocations = RepaymentAllocation.objects.filter(
+            repayment_payment__provider_session_id="cs_alloc_2"
+        )
+        self.assertEqual(
+            sorted(allocations.values_list("schedule_item_id", "amount_cents")),
+            sorted([(second.id, 1666), (third.id, 3335)]),
+        )
+        self.assertFalse(
+            RepaymentScheduleItem.objects.exclude(status=RepaymentScheduleStatus.PAID).exists()
+        )
+
+    def test_allocate_repayments_backfills_paid_payments(self):
+        borrow_request = self._borrow_request(60)
+        generate_schedule(borrow_request)
+        RepaymentPayment.objects.create(
+            borrow_request=borrow_request,
+            amount_cents=6000,
+            currency="EUR",
+            provider="stripe",
+            provider_session_id="cs_legacy",
+            status=RepaymentPaymentStatus.PAID,
+        )
+        out = StringIO()
+        call_command("allocate_repayments", stdout=out)
+        call_command("allocate_repayments", stdout=out)
+        self.assertIn("Allocated 1 repayments.", out.getvalue())
+        self.assertIn("Allocated 0 repayments.", out.getvalue())
+        self.assertEqual(
+            list(
+                borrow_request.repayment_schedule.order_by("due_date").values_list(
+                    "amount_paid_cents", "status"
+                )
+            ),
+            [(5000, RepaymentScheduleStatus.PAID), (1000, RepaymentScheduleStatus.SCHEDULED)],
+        )
+
+    def test_cash_flow_projection(self):
+        borrow_request = self._borrow_request(90)
+        generate_schedule(borrow_request, start_date=date(2026, 1, 10))
+        Campaign.objects.create(
+            title_public="Running",
+            story_public="Story",
+            terms_public="Terms",
+            category="rent",
+            amount_needed_cents=6000,
+            expected_return_days=60,
+            status=CampaignStatus.RUNNING,
+        )
+        flat = {"late_rate": 0, "late_months": 1, "default_rate": 0, "funding_rate": 1}
+        projection = project_cash_flow(horizon=3, scenario=flat, today=date(2026, 3, 15))
+        self.assertEqual(
+            [
+                (row["month"], row["scheduled_cents"], row["campaign_cents"], row["expected_cents"])
+                for row in projection["months"]
+            ],
+            # The February item is overdue and counted in the current month.
+            [("2026-03", 6666, 0, 6666), ("2026-04", 3335, 3000, 6335), ("2026-05", 0, 3000, 3000)],
+        )
+
+        projection = project_cash_flow(
+            horizon=3,
+            scenario={"late_rate": 0.5, "late_months": 1, "default_rate": 0.1, "funding_rate": 0.5},
+            today=date(2026, 3, 15),
+        )
+        expected = [row["expected_cents"] for row in projection["months"]]
+        self.assertEqual(expected, [3000, 5175, 2851])
+        self.assertEqual(projection["totals"]["campaign_cents"], 3000)
+
+        out = StringIO()
+        call_command("project_cash_flow", horizon=2, stdout=out)
+        self.assertIn("over 2 months", out.getvalue())
+
+        with self.assertRaisesMessage(CommandError, "late_months must be between 0 and 24."):
+            call_command("project_cash_flow", late_months=-1, stdout=StringIO())
+        with self.assertRaisesMessage(ValueError, "default_rate must be between 0 and 1."):
+            project_cash_flow(scenario={"default_rate": 1.5})
@@ -1,10 +1,13 @@
 from django.urls import path
 
-from .views import RepaymentPayView, RepaymentSetupView, RepaymentsMineView, RepaymentsWebhookView
+from payments.views import StripeWebhookView
+
+from .views import RepaymentPayView, RepaymentSetupView, RepaymentsMineView
 
 urlpatterns = [
     path("repayments/setup", RepaymentSetupView.as_view(), name="repayments-setup"),
     path("repayments/pay", RepaymentPayView.as_view(), name="repayments-pay"),
     path("repayments/mine", RepaymentsMineView.as_view(), name="repayments-mine"),
-    path("repayments/webhook", RepaymentsWebhookView.as_view(), name="repayments-webhook"),
+    # Legacy alias of stripe/webhook for endpoints still configured in Stripe.
+    path("repayments/webhook", StripeWebhookView.as_view(), name="repayments-webhook"),
 ]
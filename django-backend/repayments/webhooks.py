@@ -0,0 +1,94 @@
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from borrow.models import BorrowRequest, BorrowRequestStatus
+from campaigns.models import Campaign, CampaignStatus
+from payments import ledger
+from payments.webhooks import register
+
+from .allocation import allocate_payment
+from .distribution import distribute_repayment
+from .models import (
+    RepaymentPayment,
+    RepaymentPaymentStatus,
+    RepaymentSetup,
+    RepaymentSetupStatus,
+)
+
+REPAYMENT_PAYMENT = "repayment_payment"
+REPAYMENT_SETUP = "repayment_setup"
+
+
+@register("checkout.session.completed", REPAYMENT_PAYMENT)
+def handle_repayment_payment(event):
+    """Mark a repayment paid and advance the borrow request. Safe to replay."""
+    session = event.get("data", {}).get("object", {})
+    with transaction.atomic():
+        payment = (
+            RepaymentPayment.objects.select_for_update()
+            .filter(provider_session_id=session.get("id"))
+            .select_related("borrow_request")
+            .first()
+        )
+        if not payment:
+            return
+        if payment.status == RepaymentPaymentStatus.PAID:
+            return
+
+        # Repayments of one borrow request are applied one at a time: the
+        # distribution and allocation below read and rewrite running totals.
+        borrow_request = BorrowRequest.objects.select_for_update().get(id=payment.borrow_request_id)
+        payment.status = RepaymentPaymentStatus.PAID
+        payment.paid_at = timezone.now()
+        payment.save(update_fields=["status", "paid_at"])
+        ledger.record_repayment(
+            payment.id, payment.borrow_request_id, payment.amount_cents, payment.currency
+        )
+        distribute_repayment(payment)
+
+        BorrowRequest.objects.filter(id=payment.borrow_request_id).update(
+            total_paid_cents=F("total_paid_cents") + payment.amount_cents
+        )
+        borrow_request.refresh_from_db(fields=["total_paid_cents"])
+        allocate_payment(payment)
+        if borrow_request.status == BorrowRequestStatus.DISBURSED:
+            borrow_request.status = BorrowRequestStatus.IN_REPAYMENT
+            borrow_request.save(update_fields=["status"])
+
+        if borrow_request.total_paid_cents >= borrow_request.amount_requested_cents:
+            borrow_request.status = BorrowRequestStatus.COMPLETED
+            borrow_request.save(update_fields=["status"])
+            campaign = Campaign.objects.filter(borrow_request=borrow_request).first()
+            if campaign:
+                campaign.status = CampaignStatus.COMPLETED
+                campaign.save(update_fields=["status"])
+
+
+@register("checkout.session.expired", REPAYMENT_PAYMENT)
+def handle_repayment_payment_expired(event):
+    session = event.get("data", {}).get("object", {})
+    RepaymentPayment.objects.filter(
+        provider_session_id=session.get("id"), status=RepaymentPaymentStatus.PENDING
+    ).update(status=RepaymentPaymentStatus.FAILED)
+
+
+@register("checkout.session.completed", REPAYMENT_SETUP)
+def handle_repayment_setup(event):
+    """Record the saved payment method from a `mode="setup"` checkout session."""
+    session = event.get("data", {}).get("object", {})
+    RepaymentSetup.objects.filter(
+        provider_session_id=session.get("id"), status=RepaymentSetupStatus.PENDING
+    ).update(
+        status=RepaymentSetupStatus.COMPLETED,
+        setup_intent_id=session.get("setup_intent") or "",
+        completed_at=timezone.now(),
+    )
+
+
+@register("checkout.session.expired", REPAYMENT_SETUP)
+def handle_repayment_setup_expired(event):
+    session = event.get("data", {}).get("object", {})
+    RepaymentSetup.objects.filter(
+        provider_session_id=session.get("id"), status=RepaymentSetupStatus.PENDING
+    ).update(status=RepaymentSetupStatus.EXPIRED)
@@ -1,8 +1,12 @@
+import base64
+
 from django.contrib.auth import get_user_model
 from rest_framework.test import APITestCase
 
 from borrow.models import BorrowRequest, BorrowRequestStatus
 from campaigns.models import Campaign, CampaignStatus
+from payments import ledger
+from payments.models import LedgerAccount
 
 
 class StaffBorrowRequestTests(APITestCase):
@@ -34,9 +38,10 @@ class StaffBorrowRequestTests(APITestCase):
         self.client.force_authenticate(user=self.staff)
         response = self.client.get("/api/v1/admin/borrow-requests?status=SUBMITTED")
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertIn("id", response.data[0])
-        self.assertTrue(response.data[0]["id"].startswith("br_"))
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertIsNone(response.data["nextCursor"])
+        self.assertIn("id", response.data["results"][0])
+        self.assertTrue(response.data["results"][0]["id"].startswith("br_"))
 
         response = self.client.get(f"/api/v1/admin/borrow-requests/br_{self.borrow_request.id}")
         self.assertEqual(response.status_code, 200)
@@ -101,3 +106,101 @@ class StaffBorrowRequestTests(APITestCase):
         campaign = Campaign.objects.get(borrow_request=self.borrow_request)
         self.assertEqual(campaign.status, CampaignStatus.RUNNING)
         self.assertTrue(campaign.verified)
+
+    def test_list_keyset_pagination(self):
+        for i in range(6):
+            BorrowRequest.objects.create(
+                requester=self.user,
+                title=f"Queued {i}",
+                category="rent",
+                reason_detailed="Private",
+                amount_requested_cents=1000,
+                currency="EUR",
+                expected_return_days=30,
+                status=BorrowRequestStatus.SUBMITTED,
+            )
+        self.client.force_authenticate(user=self.staff)
+
+        seen = []
+        cursor = None
+        while True:
+            params = {"status": "SUBMITTED", "limit": 3}
+            if cursor:
+                params["cursor"] = cursor
+            with self.assertNumQueries(1):
+                response = self.client.get("/api/v1/admin/borrow-requests", params)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(item["id"] for item in response.data["results"])
+            cursor = response.data["nextCursor"]
+            if cursor is None:
+                break
+
+        ordered = BorrowRequest.objects.order_by("-created_at", "-id")
+        expected = [f"br_{pk}" for pk in ordered.values_list("id", flat=True)]
+        self.assertEqual(seen, expected)
+
+    def test_list_rejects_invalid_cursor(self):
+        self.client.force_authenticate(user=self.staff)
+        response = self.client.get("/api/v1/admin/borrow-requests", {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
+
+        malformed = [
+            b"\xff\xfe",  # not UTF-8
+            b'{"a": 1}',  # not a list
+            b'["2026-01-01T00:00:00+00:00"]',  # wrong length
+            b'["not a date", "00000000-0000-0000-0000-000000000000"]',
+        ]
+        for raw in malformed:
+            cursor = base64.urlsafe_b64encode(raw).decode().rstrip("=")
+            response = self.client.get("/api/v1/admin/borrow-requests", {"cursor": cursor})
+            self.assertEqual(response.status_code, 400, raw)
+
+    def test_disburse_generates_schedule_once(self):
+        self.borrow_request.status = BorrowRequestStatus.CAMPAIGN_CREATED
+        self.borrow_request.save(update_fields=["status"])
+        campaign = Campaign.objects.create(
+            borrow_request=self.borrow_request,
+            title_public="Campaign",
+            story_public="Story",
+            terms_public="Terms",
+            category="medical",
+            amount_needed_cents=7000,
+            expected_return_days=30,
+            status=CampaignStatus.RUNNING,
+            verified=True,
+        )
+        url = f"/api/v1/admin/borrow-requests/br_{self.borrow_request.id}/disburse"
+        self.client.force_authenticate(user=self.staff)
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, 400)
+
+        Campaign.objects.add_pooled(campaign.id, 7000)
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["scheduleItems"], 1)
+        self.borrow_request.refresh_from_db()
+        campaign.refresh_from_db()
+        self.assertEqual(self.borrow_request.status, BorrowRequestStatus.DISBURSED)
+        self.assertIsNotNone(self.borrow_request.disbursed_at)
+        self.assertEqual(campaign.status, CampaignStatus.DISBURSED)
+        self.assertEqual(ledger.balance(LedgerAccount.BORROWER_RECEIVABLE), 7000)
+
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.borrow_request.repayment_schedule.count(), 1)
+
+    def test_cash_flow_projection(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get("/api/v1/admin/projections/cash-flow")
+        self.assertEqual(response.status_code, 403)
+
+        self.client.force_authenticate(user=self.staff)
+        response = self.client.get(
+            "/api/v1/admin/projections/cash-flow", {"horizon": 6, "defaultRate": "0.25"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["months"]), 6)
+        self.assertEqual(response.data["scenario"]["default_rate"], 0.25)
+
+        response = self.client.get("/api/v1/admin/projections/cash-flow", {"lateRate": "2"})
+        self.assertEqual(response.status_code, 400)
@@ -4,7 +4,11 @@ from .views import (
     AdminBorrowRequestDecisionView,
     AdminBorrowRequestDetailView,
     AdminBorrowRequestListView,
+    AdminCashFlowProjectionView,
     AdminCreateCampaignView,
+    AdminDisburseView,
+    AdminLedgerBalancesView,
+    AdminPaymentsGatewayMetricsView,
 )
 
 urlpatterns = [
@@ -24,4 +28,20 @@ urlpatterns = [
         AdminCreateCampaignView.as_view(),
         name="admin-borrow-request-create-campaign",
     ),
+    path(
+        "admin/borrow-requests/<str:borrow_request_id>/disburse",
+        AdminDisburseView.as_view(),
+        name="admin-borrow-request-disburse",
+    ),
+    path("admin/ledger/balances", AdminLedgerBalancesView.as_view(), name="admin-ledger-balances"),
+    path(
+        "admin/metrics/payments-gateway",
+        AdminPaymentsGatewayMetricsView.as_view(),
+        name="admin-payments-gateway-metrics",
+    ),
+    path(
+        "admin/projections/cash-flow",
+        AdminCashFlowProjectionView.as_view(),
+        name="admin-cash-flow-projection",
+    ),
 ]
@@ -1,5 +1,6 @@
 from django.db import transaction
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from drf_spectacular.utils import extend_schema
 from rest_framework import permissions, status
 from rest_framework.response import Response
@@ -8,12 +9,20 @@ from rest_framework.views import APIView
 from borrow.models import BorrowRequest, BorrowRequestStatus
 from core.utils import parse_prefixed_uuid
 from borrow.serializers import (
+    ADMIN_BORROW_REQUEST_LIST,
     AdminBorrowRequestDetailSerializer,
     AdminBorrowRequestListSerializer,
     DecisionSerializer,
 )
 from campaigns.models import Campaign, CampaignStatus
 from campaigns.serializers import CreateCampaignSerializer
+from core.pagination import KeysetPaginator
+from payments import ledger
+from payments.gateway import latency as gateway_latency
+from repayments.projection import SCENARIO_BOUNDS, project_cash_flow
+from repayments.schedule import generate_schedule
+
+BORROW_REQUEST_QUEUE = KeysetPaginator(ordering=("-created_at", "-id"))
 
 
 class AdminBorrowRequestListView(APIView):
@@ -21,12 +30,15 @@ class AdminBorrowRequestListView(APIView):
 
     @extend_schema(responses=AdminBorrowRequestListSerializer)
     def get(self, request):
-        qs = BorrowRequest.objects.all().order_by("-created_at")
+        qs = BorrowRequest.objects.all()
         status_param = request.query_params.get("status")
         if status_param:
             qs = qs.filter(status=status_param)
-        serializer = AdminBorrowRequestListSerializer(qs, many=True)
-        return Response(serializer.data)
+        qs = ADMIN_BORROW_REQUEST_LIST.values(qs, "created_at")
+        rows, next_cursor = BORROW_REQUEST_QUEUE.paginate(qs, request)
+        return Response(
+            {"results": ADMIN_BORROW_REQUEST_LIST.serialize(rows), "nextCursor": next_cursor}
+        )
 
 
 class AdminBorrowRequestDetailView(APIView):
@@ -95,3 +107,103 @@ class AdminCreateCampaignView(APIView):
             borrow_request.save(update_fields=["status"])
 
         return Response(CreateCampaignSerializer(campaign).data, status=status.HTTP_201_CREATED)
+
+
+class AdminDisburseView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(request=None, responses=None)
+    def post(self, request, borrow_request_id):
+        borrow_request_id = parse_prefixed_uuid("br", borrow_request_id)
+        if borrow_request_id is None:
+            return Response(
+                {"detail": "Invalid borrow request id."}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        with transaction.atomic():
+            borrow_request = get_object_or_404(
+                BorrowRequest.objects.select_for_update(), id=borrow_request_id
+            )
+            campaign = (
+                Campaign.objects.select_for_update().filter(borrow_request=borrow_request).first()
+            )
+            if (
+                borrow_request.status
+                not in (BorrowRequestStatus.CAMPAIGN_CREATED, BorrowRequestStatus.FUNDED)
+                or campaign is None
+                or campaign.status != CampaignStatus.FUNDED
+            ):
+                return Response(
+                    {"detail": "Borrow request must have a FUNDED campaign to disburse."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            borrow_request.status = BorrowRequestStatus.DISBURSED
+            borrow_request.disbursed_at = timezone.now()
+            borrow_request.save(update_fields=["status", "disbursed_at", "updated_at"])
+            campaign.status = CampaignStatus.DISBURSED
+            campaign.save(update_fields=["status"])
+            ledger.record_disbursement(
+                borrow_request.id, campaign.id, campaign.amount_pooled_cents, campaign.currency
+            )
+            schedule = generate_schedule(borrow_request)
+
+        return Response(
+            {"status": borrow_request.status, "scheduleItems": len(schedule)},
+            status=status.HTTP_200_OK,
+        )
+
+
+class AdminPaymentsGatewayMetricsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(responses=None)
+    def get(self, request):
+        # Per-process counters: each worker reports its own calls.
+        return Response({"latency": gateway_latency.snapshot()})
+
+
+class AdminLedgerBalancesView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(responses=None)
+    def get(self, request):
+        return Response({"balances": ledger.balances()})
+
+
+class AdminCashFlowProjectionView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    # Query parameter -> (scenario key, type); bounds come from SCENARIO_BOUNDS.
+    SCENARIO_PARAMS = {
+        "lateRate": ("late_rate", float),
+        "lateMonths": ("late_months", int),
+        "defaultRate": ("default_rate", float),
+        "fundingRate": ("funding_rate", float),
+    }
+
+    @extend_schema(responses=None)
+    def get(self, request):
+        scenario = {}
+        for param, (name, cast) in self.SCENARIO_PARAMS.items():
+            raw = request.query_params.get(param)
+            if raw is None:
+                continue
+            low, high = SCENARIO_BOUNDS[name]
+            try:
+                value = cast(raw)
+            except ValueError:
+                value = None
+            if value is None or not low <= value <= high:
+                return Response(
+                    {"detail": f"{param} must be between {low} and {high}."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            scenario[name] = value
+        try:
+            horizon = int(request.query_params.get("horizon", 12))
+        except ValueError:
+            return Response(
+                {"detail": "horizon must be an integer."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(project_cash_flow(horizon=horizon, scenario=scenario))